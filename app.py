@@ -1,14 +1,23 @@
 import streamlit as st
 import json
 import os
+import sys
+import importlib
 from st_on_hover_tabs import on_hover_tabs
 from streamlit_lottie import st_lottie
-from menu.mcqgen import main as mcq
-from menu.Ask_to_PDF import main as ask_to_pdf_page
-from menu.NotesMaker import main as notes
-from menu.ATS import main as ats_page
-from menu.resources import main as resource_library, init_db
-from menu.firebase import firebase_collaborative_study
+from menu.resources import init_db
+from src.core.assets import load_lottie, load_style
+
+# Tab name -> (module, entry point). A page module, and the LLM/Firebase clients it
+# builds at import, is only loaded the first time its tab is opened.
+PAGES = {
+    'MCQ Generator': ('menu.mcqgen', 'main'),
+    'Ask To PDF': ('menu.Ask_to_PDF', 'main'),
+    'Notes Maker': ('menu.NotesMaker', 'main'),
+    'ATS': ('menu.ATS', 'main'),
+    'Resource Library': ('menu.resources', 'main'),
+    'Study Room': ('menu.firebase', 'firebase_collaborative_study'),
+}
 
 # Page config
 st.set_page_config(page_title="ScholarAI", page_icon="📚", layout="wide")
@@ -16,7 +25,7 @@ st.set_page_config(page_title="ScholarAI", page_icon="📚", layout="wide")
 if "current_theme" not in st.session_state:
     st.session_state.current_theme = "light"
 
-st.markdown('<style>' + open('./src/style.css').read() + '</style>', unsafe_allow_html=True)
+st.markdown(load_style('./src/style.css'), unsafe_allow_html=True)
 
 # Initialize database
 init_db()
@@ -44,12 +53,18 @@ def home():
     
     with col2:
         try:
-            with open('src/Home_student.json', encoding='utf-8') as anim_source:
-                animation_data = json.load(anim_source)
-                st_lottie(animation_data, 1, True, True, "high", 350, -100)
+            st_lottie(load_lottie('src/Home_student.json'), 1, True, True, "high", 350, -100)
         except Exception as e:
             st.error(f"Animation error: {e}")
 
+def load_page(tab):
+    module_name, entry_point = PAGES[tab]
+    if module_name in sys.modules:
+        return getattr(sys.modules[module_name], entry_point)
+    with st.spinner(f"Loading {tab}..."):
+        module = importlib.import_module(module_name)
+    return getattr(module, entry_point)
+
 def main():
     st.markdown("""
         <style>
@@ -69,17 +84,10 @@ def main():
             default_choice=0
         )
     
-    menu = {
-        'Home': home,
-        'MCQ Generator': mcq,
-        'Ask To PDF': ask_to_pdf_page,
-        'Notes Maker': notes,
-        'ATS': ats_page,
-        'Resource Library': resource_library,
-        'Study Room': firebase_collaborative_study,
-    }
-    
-    menu[tabs]()
+    if tabs == 'Home':
+        home()
+    else:
+        load_page(tabs)()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""End-to-end timings of the MCQ, Ask To PDF, ATS and Notes Maker flows without Gemini or YouTube.
+
+Run from the repository root:
+    python -m benchmarks.bench_e2e --sessions 1 4 16
+    python -m benchmarks.bench_e2e --flows ask_pdf --first-token-delay 0.8
+    python -m benchmarks.bench_e2e --recordings benchmarks/recordings.jsonl --record   # fill it from live Gemini
+
+Each flow calls the same functions its page does, with the LLM, embeddings and
+transcript clients replaced by benchmarks.replay. For every session count the
+report shows per-stage latency (p50/p95), flow throughput and the peak RSS of the
+process so far. A flow that cannot be imported here is reported and skipped.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import replay
+from benchmarks.fixtures import LOREM, UploadedFile, make_pdf
+
+RESUME = (
+    "Backend engineer with six years of Python, Django and PostgreSQL experience. "
+    "Built REST APIs, data pipelines on Airflow and CI with GitHub Actions. "
+)
+JOB_DESCRIPTION = (
+    "About us: we are a fast growing fintech company serving small businesses across Europe. Our platform team owns "
+    "the payment, ledger and reporting services and works closely with product, data and security. "
+    "The role: as a Senior Backend Engineer you will design, build and operate the services behind our APIs, mentor "
+    "engineers, take part in the on-call rotation and help shape our technical roadmap. "
+    "Requirements: Python, PostgreSQL, Kubernetes, Terraform, GraphQL, AWS.\n"
+    "- 5+ years building production backend services\n"
+    "- Event driven architecture\n"
+    "- Distributed systems and observability\n"
+    "Nice to have: Kafka, Go, experience in regulated industries. "
+    "What we offer: competitive salary, stock options, a learning budget, flexible hours and remote work within Europe. "
+    "We value diversity and encourage applicants from all backgrounds to apply, even if they do not meet every requirement."
+)
+
+
+class StageTimer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+
+    def stage(self, flow, name):
+        timer = self
+
+        class _Stage:
+            def __enter__(self):
+                self.start = time.perf_counter()
+
+            def __exit__(self, *exc):
+                with timer._lock:
+                    timer.samples[(flow, name)].append(time.perf_counter() - self.start)
+
+        return _Stage()
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def flow_mcq(timer, session, pages):
+    import json
+    from src.mcqgenerator.utils import read_file
+    from src.mcqgenerator.MCQGenerator import generate_evaluate_chain
+
+    with timer.stage("mcq", "extract"):
+        text = read_file(UploadedFile(make_pdf(pages=pages), name=f"notes-{session}.pdf"))
+    with open("Response.json", "r") as file:
+        response_json = json.dumps(json.load(file))
+    with timer.stage("mcq", "generate+review"):
+        generate_evaluate_chain({"text": text, "number": 5, "subject": "Biology", "tone": "Simple", "response_json": response_json})
+
+
+def flow_ask_pdf(timer, session, pages):
+    import streamlit as st
+    from menu.Ask_to_PDF import process_pdfs, user_input
+
+    # What "Train & Process" runs: extraction, chunking, embedding and index writes overlap.
+    # Every simulated session shares one workspace, like a class using the same course pack.
+    st.session_state.namespace = "bench"
+    with timer.stage("ask_pdf", "ingest"):
+        process_pdfs([UploadedFile(make_pdf(pages=pages), name="course.pdf")], namespace="bench")
+    with timer.stage("ask_pdf", "retrieve+answer"):
+        user_input(f"Where does the Calvin cycle take place? (session {session})")
+
+
+def flow_ask_pdf_blocking(timer, session, pages):
+    import streamlit as st
+    from menu.Ask_to_PDF import get_pdf_text, get_text_chunks, get_vector_store, user_input
+
+    # The stages one after another, to compare with flow_ask_pdf. The text differs from
+    # that flow's PDF so neither reads extractions or embeddings cached by the other.
+    st.session_state.namespace = "bench-blocking"
+    with timer.stage("ask_pdf_blocking", "extract"):
+        text = get_pdf_text([UploadedFile(make_pdf(pages=pages, text="Sequential. " + LOREM), name="course.pdf")])
+    with timer.stage("ask_pdf_blocking", "chunk"):
+        chunks = get_text_chunks(text)
+    with timer.stage("ask_pdf_blocking", "embed+index"):
+        get_vector_store(chunks, name="course.pdf", namespace="bench-blocking")
+    with timer.stage("ask_pdf_blocking", "retrieve+answer"):
+        user_input(f"Where does the Calvin cycle take place? (session {session})")
+
+
+def flow_ats(timer, session, pages):
+    from src.core.extraction import extract_pdf
+    from menu.ATS import evaluate_resume
+
+    with timer.stage("ats", "extract"):
+        text = extract_pdf(UploadedFile(make_pdf(pages=2, text=RESUME), name=f"resume-{session}.pdf")).text
+    with timer.stage("ats", "evaluate"):
+        evaluate_resume(text, JOB_DESCRIPTION)
+
+
+def flow_ats_keywords(timer, session, pages):
+    from src.core.extraction import extract_pdf
+    from menu.ATS import evaluate_resume
+
+    with timer.stage("ats_keywords", "extract"):
+        text = extract_pdf(UploadedFile(make_pdf(pages=2, text=RESUME), name=f"resume-{session}.pdf")).text
+    with timer.stage("ats_keywords", "score+summary"):
+        evaluate_resume(text, JOB_DESCRIPTION, scoring="keywords")
+
+
+def flow_notes(timer, session, pages):
+    from menu.NotesMaker import fetch_transcript, generate_notes
+
+    # A new video every time, so the transcript and notes caches always miss
+    url = f"https://www.youtube.com/watch?v=bench-{uuid.uuid4().hex}"
+    with timer.stage("notes", "transcript"):
+        segments = fetch_transcript(url)
+    with timer.stage("notes", "summarize"):
+        generate_notes(url, segments)
+
+
+def flow_notes_popular(timer, session, pages):
+    from menu.NotesMaker import fetch_transcript, generate_notes
+
+    # Every session asks for the same video, only the first request reaches YouTube and the LLM
+    url = "https://www.youtube.com/watch?v=bench-popular"
+    with timer.stage("notes_popular", "transcript"):
+        segments = fetch_transcript(url)
+    with timer.stage("notes_popular", "summarize"):
+        generate_notes(url, segments)
+
+
+FLOWS = {"mcq": flow_mcq, "ask_pdf": flow_ask_pdf, "ask_pdf_blocking": flow_ask_pdf_blocking, "ats": flow_ats, "ats_keywords": flow_ats_keywords, "notes": flow_notes, "notes_popular": flow_notes_popular}
+
+
+def run_flow(name, sessions, pages):
+    timer = StageTimer()
+    start = time.perf_counter()
+    # The MCQ chains are built with verbose=True, keep their prompt dumps out of the report
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [executor.submit(FLOWS[name], timer, session, pages) for session in range(sessions)]
+        for future in futures:
+            future.result()
+    return timer, time.perf_counter() - start
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 4, 16], help="concurrent simulated sessions")
+    parser.add_argument("--pages", type=int, default=20, help="pages in the generated study PDF")
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    parser.add_argument("--transcript-minutes", type=int, default=20, help="length of the simulated YouTube video")
+    parser.add_argument("--recordings", help="JSONL of recorded responses to replay")
+    parser.add_argument("--record", action="store_true", help="send unrecorded prompts to Gemini and append them to --recordings")
+    args = parser.parse_args()
+    if args.record and not args.recordings:
+        parser.error("--record needs --recordings")
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    backend = replay.ReplayBackend(args.recordings, args.first_token_delay, args.token_delay, record=args.record)
+    workdir = tempfile.mkdtemp(prefix="scholarai-bench-")
+    replay.install(backend, workdir, args.transcript_minutes)
+    print(f"work directory {workdir}, LLM latency {args.first_token_delay}s + {args.token_delay * 1000:.1f}ms/token")
+
+    for name in args.flows:
+        print(f"\n{name}")
+        for sessions in args.sessions:
+            try:
+                timer, wall = run_flow(name, sessions, args.pages)
+            except Exception as e:
+                print(f"  skipped: {type(e).__name__}: {e}")
+                traceback.print_exc(limit=1, file=sys.stderr)
+                break
+            print(f"  {sessions:3d} sessions  {wall:7.2f}s wall  {sessions / wall:7.2f} flows/s  peak RSS {peak_rss_mb():7.1f} MB")
+            for (_, stage), samples in timer.samples.items():
+                print(
+                    f"      {stage:<18} p50 {statistics.median(samples) * 1000:8.1f}ms"
+                    f"  p95 {percentile(samples, 0.95) * 1000:8.1f}ms"
+                )
+
+    print("\nLLM usage")
+    for kind, usage in backend.usage().items():
+        print(f"  {kind:<12} {usage['calls']:5d} calls {usage['input_tokens']:9d} tokens in {usage['output_tokens']:8d} tokens out")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Pages/sec of the shared extraction engine against the old per-page `text +=` loops.
+
+Run from the repository root:
+    python -m benchmarks.bench_extraction --pages 300 --workers 1,2,4
+"""
+import argparse
+import io
+import os
+import time
+
+import PyPDF2
+
+from benchmarks.fixtures import make_pdf
+from src.core import extraction
+
+
+def legacy_loop(data):
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text()
+    return text
+
+
+def timed(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pdf", help="benchmark an existing PDF instead of a generated one")
+    parser.add_argument(
+        "--workers",
+        default=",".join(str(n) for n in sorted({1, 2, max(os.cpu_count() or 1, 2)})),
+        help="comma separated pool sizes to run, 1 extracts inline",
+    )
+    args = parser.parse_args()
+    worker_counts = [int(n) for n in args.workers.split(",")]
+
+    if args.pdf:
+        with open(args.pdf, "rb") as f:
+            data = f.read()
+    else:
+        data = make_pdf(pages=args.pages)
+    pages = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+    expected = legacy_loop(data)
+    if pages < extraction.PARALLEL_PAGE_THRESHOLD:
+        print(f"Documents under {extraction.PARALLEL_PAGE_THRESHOLD} pages are extracted inline whatever the pool size")
+
+    results = {"legacy text += loop": timed(legacy_loop, data, args.repeat)}
+    for workers in worker_counts:
+        extraction.shutdown_executor()
+        extraction.MAX_WORKERS = workers
+        # Warm the pool so worker start-up is not charged to the first run
+        assert extraction.extract_pdf_bytes(data).text == expected
+        results[f"extract_pdf ({workers} workers)"] = timed(extraction.extract_pdf_bytes, data, args.repeat)
+    extraction.shutdown_executor()
+
+    print(f"{pages} pages, {os.cpu_count()} CPUs")
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds:8.3f}s {pages / seconds:10.1f} pages/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Latency and token usage of the sequential, fused and background quiz review modes.
+
+Run from the repository root:
+    python -m benchmarks.bench_review_modes --number 10 --repeat 3
+    python -m benchmarks.bench_review_modes --recordings benchmarks/recordings.jsonl
+    python -m benchmarks.bench_review_modes --live      # real Gemini calls, needs GOOGLE_API_KEY
+
+The model is a benchmarks.replay chat model. Offline it answers from the recordings,
+or with canned output, after a delay that grows with the output length, so the
+numbers show the shape of each mode rather than real Gemini timings. Tokens are
+counted by the replay backend at about 4 characters per token. "quiz" is when the
+questions can be shown, "review" is when the review is also ready.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks import replay
+from benchmarks.fixtures import LOREM
+
+
+def make_backend(args, run, live):
+    if live is not None:
+        # A fresh recordings file per run, so every prompt goes to Gemini and none is replayed
+        return replay.ReplayBackend(os.path.join(args.workdir, f"live-{run}.jsonl"), record=True, live=live)
+    return replay.ReplayBackend(args.recordings, args.first_token_delay, args.token_delay)
+
+
+def run_mode(mode, backend, text, number, subject, tone, response_json):
+    from src.mcqgenerator.review import generate_fused, generate_quiz_only, generate_sequential, start_review
+
+    llm = replay.ReplayChatModel(backend=backend)
+    start = time.perf_counter()
+    if mode == "sequential":
+        generate_sequential(text, number, subject, tone, response_json, llm=llm)
+        quiz_ready = review_ready = time.perf_counter() - start
+    elif mode == "fused":
+        generate_fused(text, number, subject, tone, response_json, llm=llm)
+        quiz_ready = review_ready = time.perf_counter() - start
+    else:
+        quiz = generate_quiz_only(text, number, subject, tone, response_json, llm=llm)
+        quiz_ready = time.perf_counter() - start
+        start_review(subject, quiz, llm=llm).result()
+        review_ready = time.perf_counter() - start
+    usage = backend.usage().values()
+    return {
+        "quiz": quiz_ready,
+        "review": review_ready,
+        "calls": sum(kind["calls"] for kind in usage),
+        "input_tokens": sum(kind["input_tokens"] for kind in usage),
+        "output_tokens": sum(kind["output_tokens"] for kind in usage),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--chars", type=int, default=8000, help="length of the generated study text")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--first-token-delay", type=float, default=0.4)
+    parser.add_argument("--token-delay", type=float, default=0.004)
+    parser.add_argument("--recordings", help="JSONL of recorded responses to replay, see benchmarks.bench_e2e --record")
+    parser.add_argument("--live", action="store_true", help="send every prompt to Gemini instead of replaying")
+    args = parser.parse_args()
+    args.workdir = tempfile.mkdtemp(prefix="scholarai-review-")
+
+    live = replay.live_model() if args.live else None
+    # The MCQ module builds its Gemini client on import, point it at replay before that happens
+    replay.install(make_backend(args, "import", None), args.workdir)
+    with open("Response.json", "r") as file:
+        response_json = json.dumps(json.load(file))
+    text = (LOREM * (args.chars // len(LOREM) + 1))[:args.chars]
+
+    print(f"{'mode':<12} {'quiz':>8} {'review':>8} {'calls':>6} {'tokens in':>10} {'tokens out':>11}")
+    for mode in ("sequential", "fused", "async"):
+        runs = [
+            run_mode(mode, make_backend(args, f"{mode}-{run}", live), text, args.number, "Biology", "Simple", response_json)
+            for run in range(args.repeat)
+        ]
+        best = min(runs, key=lambda run: run["review"])
+        print(
+            f"{mode:<12} {best['quiz']:7.2f}s {best['review']:7.2f}s {best['calls']:6d} "
+            f"{best['input_tokens']:10d} {best['output_tokens']:11d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Import cost of the app shell and of each page, every one measured in a fresh interpreter.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --repeat 3
+
+"eager" is what app.py paid before pages were loaded lazily: the shell plus every
+page. A page's cost is measured on top of the shell, which is what the first visit
+to its tab pays now.
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+
+SHELL_MODULES = ["streamlit", "st_on_hover_tabs", "streamlit_lottie", "menu.resources"]
+
+_PROBE = """
+import importlib, json, sys, time
+for name in {before!r}:
+    importlib.import_module(name)
+start = time.perf_counter()
+try:
+    for name in {measured!r}:
+        importlib.import_module(name)
+except Exception as e:
+    print(json.dumps({{"error": f"{{type(e).__name__}}: {{e}}"}}))
+    sys.exit(0)
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": len(sys.modules)}}))
+"""
+
+
+def read_pages(path="app.py"):
+    """The PAGES table from app.py, read without running the Streamlit script"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, "id", None) == "PAGES" for target in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"no PAGES table in {path}")
+
+
+def measure(measured, before=(), repeat=3):
+    """Best-of-`repeat` seconds to import `measured` in a new process after `before` is loaded"""
+    best = None
+    for _ in range(repeat):
+        probe = _PROBE.format(before=list(before), measured=list(measured))
+        output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True)
+        lines = output.stdout.strip().splitlines()
+        if not lines:
+            return {"error": output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "no output"}
+        result = json.loads(lines[-1])
+        if "error" in result:
+            return result
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def describe(result):
+    if "error" in result:
+        return f"{'failed':>9}  {result['error']}"
+    return f"{result['seconds']:8.3f}s  {result['modules']:6d} modules loaded"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = read_pages()
+    page_modules = [module for module, _ in pages.values()]
+    print(f"{'app shell (lazy start)':<28} {describe(measure(SHELL_MODULES, repeat=args.repeat))}")
+    print(f"{'eager (shell + all pages)':<28} {describe(measure(SHELL_MODULES + page_modules, repeat=args.repeat))}")
+    print("first visit to each tab, on top of the shell:")
+    for tab, (module, _) in pages.items():
+        print(f"  {tab:<26} {describe(measure([module], before=SHELL_MODULES, repeat=args.repeat))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Record/replay stand-ins for Gemini and YouTube so the real pipelines run offline.
+
+`install()` swaps the clients the pages construct (ChatGoogleGenerativeAI,
+google.generativeai.GenerativeModel, YouTubeTranscriptApi.get_transcript) for
+replaying versions. Call it before any page module is imported.
+
+Responses come from a JSONL recordings file when one is given: first by exact
+prompt, then any recording of the same kind of call, and only then a canned
+response. Every call sleeps `first_token_delay + token_delay * output_tokens` so
+timings have the shape of a real model. With `record=True` missing prompts go to
+the live model and are appended to the recordings file.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from benchmarks.fixtures import LOREM
+
+KINDS = ("fused", "quiz", "review", "ats_profile", "ats", "ats_summary", "notes", "qa", "other")
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def prompt_key(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def classify(prompt):
+    """Which page feature a prompt comes from, by the fixed wording of its template"""
+    if '{"quiz":' in prompt and "RESPONSE_JSON" in prompt:
+        return "fused"
+    if "RESPONSE_JSON" in prompt:
+        return "quiz"
+    if "Quiz_MCQs" in prompt:
+        return "review"
+    if "RequiredSkills" in prompt:
+        return "ats_profile"
+    if "PercentageMatch" in prompt:
+        return "ats"
+    if "ProfileSummary" in prompt:
+        return "ats_summary"
+    if "YouTube" in prompt and ("summar" in prompt or "Notes:" in prompt):
+        return "notes"
+    if "Context:" in prompt and "Question:" in prompt:
+        return "qa"
+    return "other"
+
+
+def _canned_quiz(number):
+    return {
+        str(n): {
+            "mcq": f"Where does the Calvin cycle fix carbon dioxide ({n})?",
+            "options": {"a": "Stroma", "b": "Thylakoid membrane", "c": "Outer membrane", "d": "Cytoplasm"},
+            "correct": "a",
+        }
+        for n in range(1, number + 1)
+    }
+
+
+def canned_response(prompt, kind):
+    match = re.search(r"quiz of (\d+)", prompt)
+    number = int(match.group(1)) if match else 5
+    review = "The questions match the students' level and test recall of where each stage happens. " * 2
+    if kind == "fused":
+        return json.dumps({"quiz": _canned_quiz(number), "review": review})
+    if kind == "quiz":
+        return json.dumps(_canned_quiz(number), indent=2)
+    if kind == "review":
+        return review + "\n\nUpdated quiz:\n" + json.dumps(_canned_quiz(number), indent=2)
+    if kind == "ats":
+        return json.dumps({
+            "PercentageMatch": "72%",
+            "MissingKeywordsintheResume": ["Kubernetes", "Terraform", "GraphQL"],
+            "ProfileSummary": "Solid backend experience with Python and SQL, limited exposure to cloud infrastructure.",
+        })
+    if kind == "ats_profile":
+        return json.dumps({
+            "RequiredSkills": ["Python", "PostgreSQL", "Kubernetes", "Terraform", "GraphQL", "AWS"],
+            "Summary": "Senior backend engineer building and running Python services on AWS.",
+        })
+    if kind == "ats_summary":
+        return "Solid backend experience with Python and SQL, limited exposure to cloud infrastructure such as Kubernetes and Terraform."
+    if kind == "notes":
+        return "## Key Points\n" + "".join(f"- Point {n}: {LOREM[:80]}\n" for n in range(1, 9))
+    if kind == "qa":
+        return "\nThe Calvin cycle takes place in the **stroma**.\n\n| Stage | Location |\n|---|---|\n| Light reactions | Thylakoid |\n| Calvin cycle | Stroma |\n"
+    return "OK"
+
+
+class ReplayBackend:
+    """Answers prompts from recordings or canned text after an artificial delay, and counts usage"""
+
+    def __init__(self, recordings=None, first_token_delay=0.3, token_delay=0.002, record=False, live=None):
+        self.recordings_path = recordings
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.record = record
+        self.live = live
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_kind = defaultdict(list)
+        self._turn = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.input_tokens = defaultdict(int)
+        self.output_tokens = defaultdict(int)
+        if recordings and os.path.exists(recordings):
+            with open(recordings, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._remember(json.loads(line))
+
+    def _remember(self, entry):
+        self._by_key[entry["key"]] = entry["response"]
+        self._by_kind[entry["kind"]].append(entry["response"])
+
+    def _lookup(self, prompt, kind):
+        with self._lock:
+            response = self._by_key.get(prompt_key(prompt))
+            if response is None and self._by_kind[kind]:
+                responses = self._by_kind[kind]
+                response = responses[self._turn[kind] % len(responses)]
+                self._turn[kind] += 1
+        return response
+
+    def _record(self, prompt, kind):
+        response = self.live(prompt)
+        entry = {"key": prompt_key(prompt), "kind": kind, "response": response}
+        with self._lock:
+            self._remember(entry)
+            with open(self.recordings_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return response
+
+    def respond(self, prompt):
+        """(response, simulated) for one call, simulated is False when the live model just answered it"""
+        kind = classify(prompt)
+        if self.record and self.live is not None and prompt_key(prompt) not in self._by_key:
+            response, simulated = self._record(prompt, kind), False
+        else:
+            response, simulated = self._lookup(prompt, kind) or canned_response(prompt, kind), True
+        with self._lock:
+            self.calls[kind] += 1
+            self.input_tokens[kind] += estimate_tokens(prompt)
+            self.output_tokens[kind] += estimate_tokens(response)
+        return response, simulated
+
+    def complete(self, prompt):
+        response, simulated = self.respond(prompt)
+        if simulated:
+            time.sleep(self.first_token_delay + self.token_delay * estimate_tokens(response))
+        return response
+
+    def stream(self, prompt):
+        response, simulated = self.respond(prompt)
+        if simulated:
+            time.sleep(self.first_token_delay)
+        for piece in re.findall(r"\S+\s*|\s+", response):
+            if simulated:
+                time.sleep(self.token_delay * estimate_tokens(piece))
+            yield piece
+
+    def usage(self):
+        with self._lock:
+            return {
+                kind: {"calls": self.calls[kind], "input_tokens": self.input_tokens[kind], "output_tokens": self.output_tokens[kind]}
+                for kind in KINDS if self.calls[kind]
+            }
+
+
+def _usage(prompt, response):
+    input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(response)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+def _prompt_text(messages):
+    return "\n".join(message.content if isinstance(message.content, str) else str(message.content) for message in messages)
+
+
+class ReplayChatModel(BaseChatModel):
+    """LangChain chat model backed by a ReplayBackend, accepted wherever ChatGoogleGenerativeAI is"""
+
+    backend: Any = None
+    model: str = "replay"
+    temperature: float = 0.0
+    google_api_key: Any = None
+
+    @property
+    def _llm_type(self):
+        return "replay"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        text = self.backend.complete(prompt)
+        message = AIMessage(content=text, usage_metadata=_usage(prompt, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        pieces = []
+        for piece in self.backend.stream(prompt):
+            pieces.append(piece)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        # Like Gemini, report usage once on the last chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=_usage(prompt, "".join(pieces))))
+
+
+class _UsageMetadata:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class _GenerateContentResponse:
+    def __init__(self, prompt, text):
+        self.text = text
+        self.usage_metadata = _UsageMetadata(estimate_tokens(prompt), estimate_tokens(text))
+
+
+class ReplayGenerativeModel:
+    """Stand-in for google.generativeai.GenerativeModel"""
+
+    def __init__(self, backend, model_name="replay"):
+        self.backend = backend
+        self.model_name = model_name
+
+    def generate_content(self, contents, **kwargs):
+        prompt = contents if isinstance(contents, str) else "\n".join(str(part) for part in contents)
+        return _GenerateContentResponse(prompt, self.backend.complete(prompt))
+
+
+def synthetic_transcript(video_id, minutes=20):
+    """YouTube style transcript segments, one every five seconds"""
+    words = LOREM.split()
+    segments = []
+    for n in range(minutes * 12):
+        text = " ".join(words[(n * 7 + k) % len(words)] for k in range(12))
+        segments.append({"text": text, "start": n * 5.0, "duration": 5.0})
+    return segments
+
+
+def live_model():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY"))
+    return lambda prompt: model.invoke(prompt).content
+
+
+def install(backend, workdir, transcript_minutes=20):
+    """Point the pages at `backend` and keep every cache, index and database inside `workdir`"""
+    if backend.record and backend.live is None:
+        backend.live = live_model()
+
+    os.environ["SCHOLARAI_EMBEDDINGS"] = "local"
+    os.environ["SCHOLARAI_CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.environ["SCHOLARAI_INDEX_DIR"] = os.path.join(workdir, "indexes")
+    os.environ["SCHOLARAI_QUESTION_BANK"] = os.path.join(workdir, "questionbank.db")
+    os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+    import langchain_google_genai
+    import google.generativeai as genai
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    langchain_google_genai.ChatGoogleGenerativeAI = lambda *args, **kwargs: ReplayChatModel(backend=backend, callbacks=kwargs.get("callbacks"))
+    genai.GenerativeModel = lambda model_name="replay", **kwargs: ReplayGenerativeModel(backend, model_name)
+    genai.configure = lambda **kwargs: None
+    YouTubeTranscriptApi.get_transcript = staticmethod(lambda video_id, *args, **kwargs: synthetic_transcript(video_id, transcript_minutes))
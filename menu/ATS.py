@@ -1,15 +1,103 @@
 import streamlit as st
 import google.generativeai as genai
-import PyPDF2 as pdf
+from src.core.extraction import extract_pdf
+from src.core.assets import load_lottie
+from src.core.tracing import span, token_usage, trace
+from src.ats.job_profile import get_job_profile
+from src.ats.screening import LLM_CUTOFF, parse_evaluation, rank, screen_resumes, to_csv
 from dotenv import load_dotenv
 from streamlit_lottie import st_lottie
-import json
 import os
+import pandas as pd
+from functools import partial
 
 load_dotenv()
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 model = genai.GenerativeModel('gemini-1.5-flash')
 
+# "keywords" scores the match locally and only asks the model for the profile summary
+SCORING_MODES = {"Keyword Match + AI Summary": "keywords", "Full AI Evaluation": "llm"}
+
+def generate_text(prompt):
+    with span("llm", "ats") as current:
+        response = model.generate_content(prompt)
+        current.add_tokens(*token_usage(response))
+    return response.text
+
+def job_profile(desc):
+    # Parsed once per description, every later resume reuses the cached profile
+    return get_job_profile(desc, generate=generate_text)
+
+def ats_prompt(text, desc, profile):
+    # Creating the input prompt for the generative AI
+    return f'''
+            You're a skilled ATS (Applicant Tracking System) Scanner with a deep understanding of tech roles, software development, 
+            tech consulting, and understand the ATS role in-depth. Your task is to evaluate the resume against the given job profile. 
+            You must consider that the job market is crowded with applications and you should only pick the best talent. 
+            Thus, assign the percentage & MissingKeywords with honesty & accuracy.
+            resume: {text}
+            job profile: {profile.for_prompt(desc)}
+            I want an output in one single string having the structure: {{"PercentageMatch": "%", "MissingKeywordsintheResume": [], "ProfileSummary": ""}}.
+            '''
+
+def summary_prompt(text, desc, profile, evaluation):
+    missing = ", ".join(evaluation["MissingKeywordsintheResume"]) or "none"
+    return f'''
+            You're a skilled ATS (Applicant Tracking System) Scanner with a deep understanding of tech roles.
+            The resume below matches {evaluation["PercentageMatch"]} of the job profile keywords; missing keywords: {missing}.
+            Write the ProfileSummary: 3-4 honest sentences on the candidate's strengths and gaps for this role.
+            Reply with the summary text only.
+            resume: {text}
+            job profile: {profile.for_prompt(desc)}
+            '''
+
+def evaluate_resume(text, desc, scoring="llm", evaluation=None):
+    profile = job_profile(desc)
+    if scoring == "keywords":
+        # PercentageMatch and MissingKeywordsintheResume come from the local scorer
+        evaluation = evaluation or profile.scorer().evaluate([text])[0]
+        return {**evaluation, "ProfileSummary": generate_text(summary_prompt(text, desc, profile, evaluation)).strip()}
+
+    # Parse the response data, a ValueError here is retried in batch mode
+    return parse_evaluation(generate_text(ats_prompt(text, desc, profile)))
+
+def show_ranking(placeholder, rows):
+    table = pd.DataFrame(rank(rows)).set_index("Rank")
+    placeholder.dataframe(table, use_container_width=True)
+
+def batch_screening(desc, scoring):
+    uploaded_files = st.file_uploader("Upload Resumes", type="pdf", accept_multiple_files=True, help="Pls Upload PDF files Only")
+    cutoff = st.slider(
+        "Minimum keyword match for AI review (%)", 0, 100, int(LLM_CUTOFF),
+        help="Resumes below this keyword match are ranked locally and never sent to the AI",
+    )
+
+    if st.button("Screen Resumes") and uploaded_files:
+        rows = []
+        progress = st.progress(0.0, text=f"Screening {len(uploaded_files)} resumes...")
+        placeholder = st.empty()
+        with trace("ats"):
+            profile = job_profile(desc)
+            # Rows arrive in completion order, the table is re-ranked as each one lands
+            evaluate = partial(evaluate_resume, scoring=scoring)
+            scorer = profile.scorer() if scoring == "keywords" or cutoff > 0 else None
+            results = screen_resumes(uploaded_files, desc, evaluate, scorer=scorer, cutoff=cutoff)
+            for row in results:
+                rows.append(row)
+                progress.progress(len(rows) / len(uploaded_files), text=f"Screened {len(rows)} of {len(uploaded_files)} resumes")
+                show_ranking(placeholder, rows)
+        progress.empty()
+        st.session_state.ats_batch = rows
+    elif st.session_state.get("ats_batch"):
+        show_ranking(st.empty(), st.session_state.ats_batch)
+
+    rows = st.session_state.get("ats_batch")
+    if rows:
+        failed = sum(1 for row in rows if row["Error"])
+        if failed:
+            st.warning(f"{failed} resumes could not be evaluated, they are listed last with the error.")
+        st.download_button("Download Ranking (CSV)", to_csv(rows), file_name="ats_ranking.csv", mime="text/csv")
+
 def main():
     # st.write("<h1><center>Applicant Tracking System</center></h1>", unsafe_allow_html=True)
     # st.text("👉🏻                  Personal ATS for Job-Seekers & Recruiters                   👈")
@@ -26,9 +114,7 @@ def main():
 """, unsafe_allow_html=True)
 
     # Load the animation
-    with open('src/ATS.json') as anim_source:
-        animation = json.load(anim_source)
-    st_lottie(animation, 1, True, True, "high", 200, -200)
+    st_lottie(load_lottie('src/ATS.json'), 1, True, True, "high", 200, -200)
 
     # Job role input
     st.text_input("Job Role")
@@ -36,6 +122,12 @@ def main():
     # Job description input
     desc = st.text_area("Paste the Job Description")
 
+    scoring = SCORING_MODES[st.selectbox("Scoring", list(SCORING_MODES), help="Keyword matching runs locally, only the summary uses the AI")]
+
+    if st.radio("Mode", ["Single Resume", "Batch Screening"], horizontal=True) == "Batch Screening":
+        batch_screening(desc, scoring)
+        return
+
     # File upload for resume
     uploaded_file = st.file_uploader("Upload Your Resume", type="pdf", help="Pls Upload PDF file Only")
 
@@ -45,39 +137,23 @@ def main():
     if submit:
         if uploaded_file is not None:
             # Reading the uploaded PDF file
-            reader = pdf.PdfReader(uploaded_file)
-            text = ""
-            for page_number in range(len(reader.pages)):
-                page = reader.pages[page_number]
-                text += str(page.extract_text())
-
-            # Creating the input prompt for the generative AI
-            input_prompt = f'''
-            You're a skilled ATS (Applicant Tracking System) Scanner with a deep understanding of tech roles, software development, 
-            tech consulting, and understand the ATS role in-depth. Your task is to evaluate the resume against the given description. 
-            You must consider that the job market is crowded with applications and you should only pick the best talent. 
-            Thus, assign the percentage & MissingKeywords with honesty & accuracy.
-            resume: {text}
-            description: {desc}
-            I want an output in one single string having the structure: {{"PercentageMatch": "%", "MissingKeywordsintheResume": [], "ProfileSummary": ""}}.
-            '''
+            with trace("ats"):
+                text = extract_pdf(uploaded_file).text
 
             # Spinner while evaluating
             with st.spinner("Evaluating Profile..."):
-                response = model.generate_content(input_prompt)
-
-            # Parse the response data
-            response_data = json.loads(response.text)
+                response_data = evaluate_resume(text, desc, scoring)
 
             # Display the ATS scanner results
-            st.subheader("ATS Scanner Dashboard")
-            st.subheader("Candidate Evaluation Results")
-            st.text(f"Percentage Match: {response_data['PercentageMatch']}")
-            st.subheader("Missing Keywords in the Resume")
-            for keyword in response_data['MissingKeywordsintheResume']:
-                st.text(keyword)
-            st.subheader("Profile Summary")
-            st.markdown(response_data['ProfileSummary'])
+            with span("render", "ats"):
+                st.subheader("ATS Scanner Dashboard")
+                st.subheader("Candidate Evaluation Results")
+                st.text(f"Percentage Match: {response_data['PercentageMatch']}")
+                st.subheader("Missing Keywords in the Resume")
+                for keyword in response_data['MissingKeywordsintheResume']:
+                    st.text(keyword)
+                st.subheader("Profile Summary")
+                st.markdown(response_data['ProfileSummary'])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
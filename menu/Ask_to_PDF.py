@@ -1,19 +1,18 @@
 import streamlit as st
-from PyPDF2 import PdfReader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 import os
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 import google.generativeai as genai
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains.question_answering import load_qa_chain
-from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
 from streamlit_lottie import st_lottie 
-import json
-import faiss
-import pickle
-import asyncio
+from src.core.extraction import extract_many
+from src.core.assets import load_lottie
+from src.core.tracing import span, trace
+from src.core.text_cache import content_hash
+from src.askpdf.index_manager import DEFAULT_NAMESPACE, get_index_manager
+from src.askpdf.pipeline import ingest_stream
+from src.askpdf.embeddings import get_embeddings
+from src.askpdf.answer_cache import get_answer_cache
+from src.askpdf.qa_chain import stream_answer
 
 load_dotenv()
 
@@ -21,81 +20,82 @@ os.getenv("GOOGLE_API_KEY")
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 def get_pdf_text(pdf_docs):
-    text = ""
-    for pdf in pdf_docs:
-        pdf_reader = PdfReader(pdf)
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-    return text
+    with trace("ask_pdf"):
+        return "".join(doc.text for doc in extract_many(pdf_docs))
+
+def get_text_splitter():
+    return RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, add_start_index=True)
 
 def get_text_chunks(text):
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    chunks = text_splitter.split_text(text)
+    text_splitter = get_text_splitter()
+    with span("chunk", "ask_pdf", chars=len(text)):
+        chunks = text_splitter.split_text(text)
     return chunks
 
-def get_vector_store(text_chunks):
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    vector_store = FAISS.from_texts(text_chunks, embedding=embeddings)
-    faiss.write_index(vector_store.index, "faiss_index.bin")
-    with open("faiss_store.pkl", "wb") as f:
-        pickle.dump({"docstore": vector_store.docstore, "index_to_docstore_id": vector_store.index_to_docstore_id}, f)
-
-def load_vector_store():
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    index = faiss.read_index("faiss_index.bin")
-    with open("faiss_store.pkl", "rb") as f:
-        store_data = pickle.load(f)
-    vector_store = FAISS(embedding_function=embeddings.embed_query, index=index, docstore=store_data["docstore"], index_to_docstore_id=store_data["index_to_docstore_id"])
-    return vector_store
-
-async def get_conversational_chain():
-    prompt_template = """
-    Leave First 1 line empty and then give reply
-    1. Answer the question as detailed as possible from the provided context 
-    2. (if not in context search on Internet), 
-    3. make sure to provide all the details Properly, 
-    4. use pointers and tables to make context more readable. 
-    5. If information not found then search on google and then provide reply.
-    6. (but then mention the reference name)
-    7. If 'Summarize' word is used in input then Summarize the context.
-    8. If input is: 'Hello', reply: Hey hi Suraj.\n\n
-    9. Use Markdown font to make text more readable
-    
-    Context:\n {context}?\n
-    Question: \n{question}\n
-
-    Answer:
-    """
-
-    model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.3)
-
-    prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
-    chain = load_qa_chain(model, chain_type="stuff", prompt=prompt)
-
-    return chain
+def current_namespace():
+    # The workspace is kept in the URL, so a refresh or a shared link opens the same documents
+    if 'namespace' not in st.session_state:
+        st.session_state.namespace = st.query_params.get("workspace", DEFAULT_NAMESPACE)
+    return st.session_state.namespace
+
+def get_vector_store(text_chunks, doc_id=None, name=None, index=None, namespace=None):
+    # Adds one document to the namespace's index, chunks that were embedded before are skipped
+    if index is None:
+        with get_index_manager().writing(namespace or current_namespace()) as index:
+            return get_vector_store(text_chunks, doc_id, name, index)
+    doc_id = doc_id or content_hash("\n".join(text_chunks).encode("utf-8"))
+    with trace("ask_pdf"):
+        return index.add_document(doc_id, name or doc_id[:12], text_chunks)
+
+def process_pdfs(pdf_docs, namespace=None, progress=None):
+    # Pages, chunks, embeddings and index writes overlap instead of running one after another
+    with trace("ask_pdf"), get_index_manager().writing(namespace or current_namespace()) as index:
+        stats = ingest_stream(index, pdf_docs, get_text_splitter(), progress=progress)
+    return stats["embedded"]
+
+def remove_pdf(doc_id, namespace=None):
+    with get_index_manager().writing(namespace or current_namespace()) as index:
+        return index.remove_document(doc_id)
+
+def list_indexed_pdfs(namespace=None):
+    return get_index_manager().documents(namespace or current_namespace())
+
+def load_vector_store(namespace=None):
+    # Shared across sessions of the same namespace, reloaded only when a new generation is published
+    return get_index_manager().open(namespace or current_namespace())
 
 def user_input(user_question):
-    vector_store = load_vector_store()
-    docs = vector_store.similarity_search(user_question)
-
-    chain = asyncio.run(get_conversational_chain())
-
-    response = chain(
-        {"input_documents": docs, "question": user_question},
-        return_only_outputs=True
-    )
-
-    st.session_state.output_text = response["output_text"]
-    st.write("Reply: ", st.session_state.output_text)
+    with trace("ask_pdf"):
+        namespace = current_namespace()
+        vector_store = load_vector_store(namespace)
+        if vector_store is None:
+            st.warning("Upload your PDF files and click Train & Process first")
+            return
+
+        # The same question, or a near duplicate, against the same index is answered from the cache
+        generation = get_index_manager().generation(namespace)
+        question_vector = get_embeddings().embed_query(user_question)
+        answer_cache = get_answer_cache()
+        cached_answer = answer_cache.get(namespace, generation, user_question, question_vector)
+        if cached_answer is not None:
+            st.session_state.output_text = cached_answer
+            st.write("Reply: ", st.session_state.output_text)
+            return
+
+        with span("retrieve", k=4) as current:
+            docs = vector_store.similarity_search_by_vector(question_vector)
+            current.set(hits=len(docs))
+
+        st.write("Reply: ")
+        st.session_state.output_text = st.write_stream(stream_answer(docs, user_question))
+        answer_cache.put(namespace, generation, user_question, st.session_state.output_text, question_vector)
 
 def main():
     # st.set_page_config("College.ai", page_icon='🔍', layout='centered')
     st.write("")
     st.write("<h1><center>One-Click Conversions</center></h1>", unsafe_allow_html=True)
     st.write("")
-    with open('src/Robot.json', encoding='utf-8') as anim_source:
-        animation = json.load(anim_source)
-    st_lottie(animation, 1, True, True, "high", 100, -200)
+    st_lottie(load_lottie('src/Robot.json'), 1, True, True, "high", 100, -200)
 
     if 'pdf_docs' not in st.session_state:
         st.session_state.pdf_docs = None
@@ -109,16 +109,40 @@ def main():
     if 'prompt_selected' not in st.session_state:
         st.session_state.prompt_selected = ""
 
+    workspace = st.text_input("Workspace", value=current_namespace(), help="Share a workspace name with your class to use the same trained documents")
+    if workspace and workspace != st.session_state.namespace:
+        st.session_state.namespace = workspace
+        st.query_params["workspace"] = workspace
+
     pdf_docs = st.file_uploader("Upload your PDF Files and Click on the Submit & Process Button", accept_multiple_files=True)
 
     if st.button("Train & Process"):
         if pdf_docs:
             with st.spinner("🤖Processing..."):
-                raw_text = get_pdf_text(pdf_docs)
-                text_chunks = get_text_chunks(raw_text)
-                get_vector_store(text_chunks)
-                st.success("Done, AI is trained")
-
+                progress_bar = st.progress(0.0)
+
+                def show_progress(stats):
+                    done = stats["processed"] + stats["skipped"]
+                    progress_bar.progress(
+                        done / stats["documents"],
+                        text=f"{done}/{stats['documents']} files · {stats['pages']} pages · {stats['embedded']} chunks embedded",
+                    )
+
+                added = process_pdfs(pdf_docs, progress=show_progress)
+                progress_bar.empty()
+                st.success(f"Done, AI is trained ({added} new chunks embedded)")
+
+    indexed_pdfs = list_indexed_pdfs()
+    if indexed_pdfs:
+        with st.expander(f"Trained documents ({len(indexed_pdfs)})"):
+            for doc_id, name in indexed_pdfs.items():
+                col1, col2 = st.columns([5, 1])
+                col1.write(name)
+                if col2.button("Remove", key=f"remove_{doc_id}"):
+                    remove_pdf(doc_id)
+                    st.rerun()
+            usage = get_index_manager().memory_usage()
+            st.caption(f"{len(usage)} indexes loaded, {sum(u['total'] for u in usage.values()) / 1e6:.1f} MB")
     
 
     user_question = st.text_input("Ask a Question from the PDF Files")
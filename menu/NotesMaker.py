@@ -4,13 +4,11 @@ load_dotenv()
 import streamlit as st
 import os
 import google.generativeai as genai
-from youtube_transcript_api import YouTubeTranscriptApi
+from src.core.tracing import span, token_usage
+from src.notes.summarizer import split_transcript, summarize_transcript, transcript_text
+from src.notes.notes_cache import cached_notes, cached_transcript
 
-def main():
-    genai.configure(api_key = os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    
-    prompt = """
+prompt = """
     I am Bard, your AI YouTube video summarizer!
     Give me the transcript text of any YouTube video, and I'll condense it into a concise summary within 250 words. Here's what you'll get:
 
@@ -20,21 +18,35 @@ def main():
     Just paste the transcript text below, and let me work my magic! ✨
     """
 
-    def extract_transcript_details(youtube_video_url):
-        try:
-            video_id = youtube_video_url.split("=")[1]
-            transcript_text = YouTubeTranscriptApi.get_transcript(video_id)
-            transcript = ""
-            for i in transcript_text:
-                transcript += " " + i["text"]
-            return transcript
-        except Exception as e:
-            raise e
-        
-    def generate_gemini_content(transcript_text, prompt):
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt + transcript_text)
-        return response.text
+def fetch_transcript(youtube_video_url, use_cache=True):
+    # Caption segments: [{"text", "start", "duration"}], kept on disk per video id
+    video_id = youtube_video_url.split("=")[1]
+    with span("extract", "notes", source="youtube"):
+        return cached_transcript(video_id, use_cache=use_cache)
+
+def extract_transcript_details(youtube_video_url):
+    return transcript_text(fetch_transcript(youtube_video_url))
+
+def generate_text(full_prompt):
+    model = genai.GenerativeModel("gemini-1.5-flash")
+    with span("llm", "notes") as current:
+        response = model.generate_content(full_prompt)
+        current.add_tokens(*token_usage(response))
+    return response.text
+
+def generate_gemini_content(transcript_text, prompt):
+    return generate_text(prompt + transcript_text)
+
+def summarize_segments(segments):
+    # Long lectures are summarized section by section in parallel, then merged
+    return summarize_transcript(segments, prompt, generate_text)
+
+def generate_notes(youtube_video_url, segments, use_cache=True):
+    video_id = youtube_video_url.split("=")[1]
+    return cached_notes(video_id, segments, prompt, summarize_segments, use_cache=use_cache)
+
+def main():
+    genai.configure(api_key = os.getenv("GOOGLE_API_KEY"))
     
     st.title("YouTube Videos to Detailed Notes Converter")
     youtube_link = st.text_input("Enter your video link")
@@ -44,11 +56,14 @@ def main():
         st.image(f"http://img.youtube.com/vi/{video_id}/0.jpg", use_column_width=True)
 
     if st.button("Get Detailed Notes"):
-        transcript_text = extract_transcript_details(youtube_link)
-        if transcript_text:
-            summary = generate_gemini_content(transcript_text, prompt)
-            st.markdown("## Detailed Notes:")
-            st.write(summary)
+        segments = fetch_transcript(youtube_link)
+        if segments:
+            sections = len(split_transcript(segments))
+            with st.spinner(f"Summarizing the transcript{f' in {sections} sections' if sections > 1 else ''}..."):
+                summary = generate_notes(youtube_link, segments)
+            with span("render", "notes"):
+                st.markdown("## Detailed Notes:")
+                st.write(summary)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,11 +3,18 @@ import json
 import PyPDF2
 import pandas as pd
 import traceback
+import uuid
 from dotenv import load_dotenv
-from src.mcqgenerator.utils import read_file, get_table_data
+from src.mcqgenerator.utils import read_file, get_table_data, extract_quiz_json
 from src.mcqgenerator.logger import logging
 import streamlit as st
-from src.mcqgenerator.MCQGenerator import generate_evaluate_chain
+from src.mcqgenerator.MCQGenerator import generate_evaluate_chain, review_chain
+from src.mcqgenerator.map_reduce import MODES, generate_quiz, resolve_mode
+from src.mcqgenerator.streaming import iter_quiz_questions, stream_quiz
+from src.mcqgenerator.review import REVIEW_MODES, start_review
+from src.mcqgenerator.question_bank import fill_quiz, get_question_bank
+from src.mcqgenerator.quiz_cache import cached_fill_quiz, quiz_cache_key, store_quiz
+from src.core.tracing import span, trace
 with open(r"Response.json", 'r') as file:
     RESPONSE_JSON = json.load(file)
 def main():
@@ -26,13 +33,21 @@ def main():
         st.session_state.score = 0
     if 'show_error' not in st.session_state:
         st.session_state.show_error = False
+    if 'bank_user' not in st.session_state:
+        # Identifies this session in the question bank, so it is not served the same question twice
+        st.session_state.bank_user = str(uuid.uuid4())
 
-    def process_quiz_data(quiz_json):
-        """Convert the nested JSON structure to a more manageable format"""
+    def process_quiz_data(quiz_json, on_question=None):
+        """Convert the nested JSON structure to a more manageable format.
+
+        Also accepts the (question_num, question) pairs of a streamed quiz, calling
+        on_question for each one as it arrives.
+        """
         processed_data = []
         quiz_dict = json.loads(quiz_json) if isinstance(quiz_json, str) else quiz_json
+        questions = quiz_dict.items() if isinstance(quiz_dict, dict) else quiz_dict
     
-        for question_num, question_data in quiz_dict.items():
+        for question_num, question_data in questions:
             processed_question = {
                 'question_num': question_num,
                 'mcq': question_data['mcq'],
@@ -40,6 +55,8 @@ def main():
                 'correct': question_data['correct']
             }
             processed_data.append(processed_question)
+            if on_question is not None:
+                on_question(processed_question)
     
         return processed_data
 
@@ -68,33 +85,72 @@ def main():
             mcq_count = st.number_input("No. of MCQs", min_value=3, max_value=50)
             subject = st.text_input("Insert Subject", max_chars=20)
             tone = st.text_input("Complexity Level of Questions", max_chars=20, placeholder="Simple")
+            mode = st.selectbox(
+                "Generation Mode",
+                MODES,
+                format_func=lambda m: {"auto": "Auto", "single": "Single pass", "map_reduce": "Section by section"}[m],
+                help="Section by section splits long documents and generates questions for each part in parallel",
+            )
+            review_mode = st.selectbox(
+                "Quiz Review",
+                REVIEW_MODES,
+                format_func=lambda m: {"sequential": "After the quiz", "fused": "Together with the quiz", "async": "In the background"}[m],
+                help="Together with the quiz asks for the quiz and its review in one call, in the background shows the quiz first and adds the review when it is ready",
+            )
+            use_cache = st.checkbox("Reuse questions already generated for the same file and settings", value=True)
             button = st.form_submit_button("Create MCQs")
 
             if button and uploaded_file is not None and mcq_count and subject and tone:
-                with st.spinner("loading..."):
+                with st.spinner("loading..."), trace("mcq"):
                     try:
                         text = read_file(uploaded_file)
-                        response = generate_evaluate_chain({
-                            "text": text,
-                            "number": mcq_count,
-                            "subject": subject,
-                            "tone": tone,
-                            "response_json": json.dumps(RESPONSE_JSON)
-                        })
+
+                        def generate(count):
+                            if resolve_mode(text, mode) == "single" and review_mode != "fused":
+                                # Show each question as soon as the model finishes writing it
+                                preview = st.container()
+                                pieces = []
+
+                                def quiz_stream():
+                                    for piece in stream_quiz(text, count, subject, tone, json.dumps(RESPONSE_JSON)):
+                                        pieces.append(piece)
+                                        yield piece
+
+                                process_quiz_data(
+                                    iter_quiz_questions(quiz_stream()),
+                                    on_question=lambda q: preview.markdown(f"**Q{q['question_num']}. {q['mcq']}**"),
+                                )
+                                quiz = "".join(pieces)
+                                review = None if review_mode == "async" else review_chain({"subject": subject, "quiz": quiz})["review"]
+                                return {"quiz": quiz, "review": review}
+                            return generate_quiz(text, count, subject, tone, json.dumps(RESPONSE_JSON), mode=mode, review_mode=review_mode)
+
+                        # An exact repeat comes from the quiz cache, otherwise unused banked
+                        # questions go first and the LLM only writes the rest
+                        cache_key = quiz_cache_key(text, mcq_count, subject, tone, mode, review_mode)
+                        response = cached_fill_quiz(cache_key, lambda: fill_quiz(
+                            get_question_bank(), text, mcq_count, subject, tone, generate,
+                            user_id=st.session_state.bank_user, reuse=use_cache,
+                        ), use_cache=use_cache)
 
                     except Exception as e:
                         traceback.print_exception(type(e), e, e.__traceback__)
                         st.error("Error")
                     else:
                         if isinstance(response, dict):
-                            quiz_json_start = response['quiz'].find('{')
-                            quiz_json_end = response['quiz'].rfind('}') + 1
-                            quiz_json = response['quiz'][quiz_json_start:quiz_json_end]
+                            quiz_json = extract_quiz_json(response['quiz'])
                             if quiz_json:
                                 try:
                                     processed_quiz_data = process_quiz_data(quiz_json)
                                     st.session_state.quiz_data = processed_quiz_data
                                     st.session_state.review = response.get("review", "")
+                                    st.session_state.review_future = None
+                                    if st.session_state.review is None:
+                                        quiz = response['quiz']
+                                        st.session_state.review_future = start_review(
+                                            subject, quiz,
+                                            on_done=lambda review: store_quiz(cache_key, {"quiz": quiz, "review": review}),
+                                        )
                                 except Exception as e:
                                     st.error(f"Error processing quiz data: {str(e)}")
                             else:
@@ -104,12 +160,24 @@ def main():
     if st.session_state.quiz_data is not None and not st.session_state.quiz_submitted:
         st.subheader("Answer the following questions:")
         
+        review_future = st.session_state.get("review_future")
+        if review_future is not None and review_future.done() and review_future.exception() is None:
+            st.session_state.review = review_future.result()
+            st.session_state.review_future = None
+        with st.expander("Quiz Review"):
+            if st.session_state.get("review"):
+                st.write(st.session_state.review)
+            elif review_future is not None and not review_future.done():
+                st.caption("The review is still being written, it will appear here on the next interaction.")
+            else:
+                st.caption("No review available.")
+
         # Display error message if needed
         if st.session_state.show_error:
             st.error("Please answer all questions before submitting.")
             st.session_state.show_error = False
         
-        with st.form("quiz_form"):
+        with st.form("quiz_form"), span("render", "mcq", questions=len(st.session_state.quiz_data)):
             for i, question in enumerate(st.session_state.quiz_data):
                 st.markdown(f"**Q{i+1}. {question['mcq']}**")
                 
@@ -0,0 +1,165 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_ANSWERS = int(os.getenv("SCHOLARAI_ANSWER_CACHE_SIZE", "512"))
+ANSWER_TTL_SECONDS = float(os.getenv("SCHOLARAI_ANSWER_CACHE_TTL", "3600"))
+# Cosine similarity of the query embeddings above which a cached answer may be reused for a
+# differently worded question. Rewordings of one question ("what is X" / "explain X") score
+# about 0.95 and above with the Gemini embeddings, while questions about a different topic
+# of the same document stay below. Questions that differ only in a number or a name can
+# score higher than that, which is why question_signature must match as well.
+SIMILARITY_THRESHOLD = float(os.getenv("SCHOLARAI_ANSWER_CACHE_THRESHOLD", "0.95"))
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+# Only double quotes mark a phrase, single ones are too often apostrophes
+_WORD = re.compile(r"[\"\u201c]([^\"\u201c\u201d]+)[\"\u201d]|([A-Za-z0-9][\w\-]*)")
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+    "seven": "7", "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+    "first": "1", "second": "2", "third": "3", "fourth": "4", "fifth": "5",
+}
+
+
+def normalize_question(question):
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.strip(" ?!.")
+
+
+def _normalize_number(text):
+    text = text.replace(",", "")
+    return text.rstrip("0").rstrip(".") if "." in text else text.lstrip("0") or "0"
+
+
+def question_signature(question):
+    """Numbers and named entities of a question, which a near-duplicate must share to reuse its answer.
+
+    Numbers are normalized, so "1,000" and "1000.0" or "three" and "3" are the same.
+    Entities are double-quoted phrases, acronyms, words with digits or inner
+    capitals, and capitalized words that do not start the question.
+    """
+    signature = {_normalize_number(number) for number in _NUMBER.findall(question)}
+    for position, match in enumerate(_WORD.finditer(question)):
+        quoted, word = match.groups()
+        if quoted:
+            signature.add(normalize_question(quoted))
+            continue
+        if word.lower() in NUMBER_WORDS:
+            signature.add(NUMBER_WORDS[word.lower()])
+        elif (
+            any(char.isdigit() for char in word) and not word.isdigit()
+            or word.isupper() and len(word) > 1
+            or any(char.isupper() for char in word[1:])
+            or word[0].isupper() and position > 0
+        ):
+            signature.add(word.lower())
+    return frozenset(signature)
+
+
+class AnswerCache:
+    """Answers to Ask To PDF questions, shared by every session on the same index.
+
+    Entries are keyed by namespace, index generation and normalized question, and
+    a miss on the exact key falls back to the closest earlier question by query
+    embedding, if it is at least `threshold` similar and asks about the same
+    numbers and entities (question_signature). Entries expire after `ttl` seconds, the least recently used are
+    dropped past `max_entries`, and a new generation of a namespace drops all of
+    its older answers.
+    """
+
+    def __init__(self, max_entries=MAX_ANSWERS, ttl=ANSWER_TTL_SECONDS, threshold=SIMILARITY_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_generation(self, namespace, generation):
+        if self._generations.get(namespace) != generation:
+            self._generations[namespace] = generation
+            for key in [key for key in self._entries if key[0] == namespace and key[1] != generation]:
+                del self._entries[key]
+
+    def _expired(self, entry, now):
+        return now - entry["created"] > self.ttl
+
+    def get(self, namespace, generation, question, vector=None):
+        now = time.monotonic()
+        key = (namespace, generation, normalize_question(question))
+        with self._lock:
+            self._check_generation(namespace, generation)
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+            if entry is None and vector is not None:
+                key, entry = self._nearest(namespace, generation, vector, question_signature(question), now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["answer"]
+
+    def _nearest(self, namespace, generation, vector, signature, now):
+        # "Summarize chapter 3" must not be answered with the summary of chapter 4, however close the embeddings are
+        candidates = [
+            (key, entry) for key, entry in self._entries.items()
+            if key[0] == namespace and key[1] == generation and entry["vector"] is not None
+            and entry["signature"] == signature and not self._expired(entry, now)
+        ]
+        if not candidates:
+            return None, None
+        query = _unit(vector)
+        scores = np.stack([entry["vector"] for _, entry in candidates]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None, None
+        return candidates[best]
+
+    def put(self, namespace, generation, question, answer, vector=None):
+        key = (namespace, generation, normalize_question(question))
+        with self._lock:
+            self._check_generation(namespace, generation)
+            self._entries[key] = {
+                "answer": answer,
+                "vector": None if vector is None else _unit(vector),
+                "signature": question_signature(question),
+                "created": time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache()
+        return _answer_cache
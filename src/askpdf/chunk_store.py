@@ -0,0 +1,169 @@
+import json
+import mmap
+import os
+import pickle
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+# One fixed-size row per chunk, in FAISS index order
+ROW_DTYPE = np.dtype([("id", "S64"), ("offset", "<i8"), ("length", "<i4"), ("source", "<i4"), ("page", "<i4")])
+
+
+def chunk_store_paths(prefix):
+    return {
+        "text": prefix + ".bin",
+        "rows": prefix + ".npy",
+        "order": prefix + "_order.npy",
+        "sources": prefix + ".json",
+    }
+
+
+def chunk_store_exists(prefix):
+    return os.path.exists(chunk_store_paths(prefix)["rows"])
+
+
+def write_chunk_store(prefix, documents):
+    """Write (id, Document) pairs, in index order, as a text blob plus a row table.
+
+    Texts are streamed straight into the blob, only the fixed-size rows and the
+    list of distinct sources are held in memory while writing.
+    """
+    paths = chunk_store_paths(prefix)
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    sources = []
+    source_rows = {}
+    rows = []
+
+    with open(paths["text"] + suffix, "wb") as blob:
+        for doc_id, document in documents:
+            data = document.page_content.encode("utf-8")
+            metadata = document.metadata or {}
+            source = (metadata.get("source", ""), metadata.get("document", ""))
+            if source not in source_rows:
+                source_rows[source] = len(sources)
+                sources.append({"source": source[0], "document": source[1]})
+            rows.append((doc_id.encode("ascii"), blob.tell(), len(data), source_rows[source], metadata.get("page", -1)))
+            blob.write(data)
+
+    table = np.array(rows, dtype=ROW_DTYPE)
+    with open(paths["rows"] + suffix, "wb") as f:
+        np.save(f, table)
+    with open(paths["order"] + suffix, "wb") as f:
+        np.save(f, np.argsort(table["id"], kind="stable").astype(np.int64))
+    with open(paths["sources"] + suffix, "w", encoding="utf-8") as f:
+        json.dump({"sources": sources}, f)
+
+    # The row table goes last, it is what readers check to see a new store
+    for name in ("text", "order", "sources", "rows"):
+        os.replace(paths[name] + suffix, paths[name])
+
+
+def migrate_pickle_store(pickle_path, prefix):
+    """Convert a faiss_store.pkl written by older versions into a chunk store"""
+    with open(pickle_path, "rb") as f:
+        store_data = pickle.load(f)
+    docstore = store_data["docstore"]
+    index_to_docstore_id = store_data["index_to_docstore_id"]
+    write_chunk_store(prefix, (
+        (index_to_docstore_id[i], docstore.search(index_to_docstore_id[i]))
+        for i in range(len(index_to_docstore_id))
+    ))
+    os.replace(pickle_path, pickle_path + ".migrated")
+
+
+class ChunkIds(Mapping):
+    """Read-only index position -> chunk id view over the row table"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getitem__(self, position):
+        if not 0 <= position < len(self.rows):
+            raise KeyError(position)
+        return self.rows["id"][position].decode("ascii")
+
+    def __iter__(self):
+        return iter(range(len(self.rows)))
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class ChunkStore(Docstore):
+    """Memory-mapped chunk texts and metadata, read lazily one chunk at a time"""
+
+    def __init__(self, prefix):
+        paths = chunk_store_paths(prefix)
+        self.rows = np.load(paths["rows"], mmap_mode="r")
+        self.order = np.load(paths["order"], mmap_mode="r")
+        with open(paths["sources"], "r", encoding="utf-8") as f:
+            self.sources = json.load(f)["sources"]
+        with open(paths["text"], "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + len(self._text)
+
+    def ids(self):
+        return ChunkIds(self.rows)
+
+    def row_of(self, doc_id):
+        if not len(self.rows):
+            return None
+        key = doc_id.encode("ascii")
+        ids = self.rows["id"]
+        position = int(np.searchsorted(ids, key, sorter=self.order))
+        if position < len(self.order):
+            row = int(self.order[position])
+            if ids[row] == key:
+                return row
+        return None
+
+    def document_at(self, row):
+        offset, length, source, page = (self.rows[name][row] for name in ("offset", "length", "source", "page"))
+        text = bytes(self._text[int(offset):int(offset) + int(length)]).decode("utf-8")
+        metadata = {key: value for key, value in self.sources[int(source)].items() if value}
+        if page >= 0:
+            metadata["page"] = int(page)
+        return Document(page_content=text, metadata=metadata)
+
+    def search(self, search):
+        row = self.row_of(search)
+        if row is None:
+            return f"ID {search} not found."
+        return self.document_at(row)
+
+
+class MutableChunkStore(Docstore, AddableMixin):
+    """Overlay used while ingesting: new and deleted chunks on top of an existing chunk store"""
+
+    def __init__(self, base=None):
+        self.base = base
+        self.added = {}
+        self.deleted = set()
+
+    def add(self, texts):
+        for doc_id, document in texts.items():
+            self.deleted.discard(doc_id)
+            self.added[doc_id] = document
+
+    def delete(self, ids):
+        for doc_id in ids:
+            if self.added.pop(doc_id, None) is None:
+                self.deleted.add(doc_id)
+
+    def search(self, search):
+        if search in self.added:
+            return self.added[search]
+        if search in self.deleted or self.base is None:
+            return f"ID {search} not found."
+        return self.base.search(search)
@@ -0,0 +1,247 @@
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, appends are then only serialized within one process
+    fcntl = None
+
+from src.core.text_cache import CACHE_DIR
+from src.core.tracing import span
+
+EMBEDDING_MODEL = os.getenv("SCHOLARAI_EMBEDDING_MODEL", "models/embedding-001")
+# "google" calls Gemini, "local" uses the deterministic offline embedder
+EMBEDDING_BACKEND = os.getenv("SCHOLARAI_EMBEDDINGS", "google")
+BATCH_SIZE = int(os.getenv("SCHOLARAI_EMBED_BATCH", "64"))
+MAX_CONCURRENT_BATCHES = int(os.getenv("SCHOLARAI_EMBED_CONCURRENCY", "4"))
+
+_TOKEN = re.compile(r"\w+")
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic offline embedder built from hashed word and bigram features.
+
+    Texts that share words end up close together, which is enough for the ingestion
+    pipeline, retrieval and caches to be exercised and benchmarked without network access.
+    """
+
+    def __init__(self, dim=768):
+        self.dim = dim
+        self.model = f"local-hash-{dim}"
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = _TOKEN.findall(text.lower())
+        for feature in tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class EmbeddingCache:
+    """Persistent map from chunk hash to vector.
+
+    Vectors live in one append-only float32 file read through a memory map. Each
+    line of the key file holds a hash and its row, written only after the vector,
+    so a key never points at a missing or foreign row. Appends hold an exclusive
+    file lock, so several processes can share one directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.keys_path = os.path.join(directory, "keys.txt")
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.dim_path = os.path.join(directory, "dim")
+        self.lock_path = os.path.join(directory, "lock")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self.dim = None
+        self.rows = {}
+        # Rows in the vector file that some key points at, and how much of the key file has been read
+        self._stored = 0
+        self._keys_read = 0
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, self._file_lock():
+            self._sync()
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _sync(self):
+        """Pick up keys other processes appended and cut off anything a crashed write left behind.
+
+        The caller holds the file lock.
+        """
+        if self.dim is None:
+            if not os.path.exists(self.dim_path):
+                return
+            with open(self.dim_path, "r") as f:
+                self.dim = int(f.read())
+
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "rb+") as f:
+                f.seek(self._keys_read)
+                chunk = f.read()
+                complete = chunk[:chunk.rfind(b"\n") + 1]
+                if len(complete) < len(chunk):
+                    # A key line cut short by a crash, drop it before anything is appended after it
+                    f.truncate(self._keys_read + len(complete))
+            for line in complete.decode("utf-8").splitlines():
+                parts = line.split()
+                if len(parts) == 2:
+                    self.rows[parts[0]] = int(parts[1])
+                elif len(parts) == 1:
+                    # Key files from before rows were recorded list keys in row order
+                    self.rows.setdefault(parts[0], len(self.rows))
+            self._keys_read += len(complete)
+
+        row_bytes = 4 * self.dim
+        stored = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        self.rows = {key: row for key, row in self.rows.items() if row < stored}
+        self._stored = max(self.rows.values(), default=-1) + 1
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != self._stored * row_bytes:
+            # Vectors whose keys were never written would otherwise be handed to the next keys
+            os.truncate(self.vectors_path, self._stored * row_bytes)
+            self._matrix = None
+
+    def _vectors(self):
+        if self._matrix is None or len(self._matrix) < self._stored:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._stored, self.dim))
+        return self._matrix
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def get_many(self, keys):
+        with self._lock:
+            found = [key for key in keys if key in self.rows]
+            if not found:
+                return {}
+            matrix = self._vectors()
+            return {key: matrix[self.rows[key]] for key in found}
+
+    def put_many(self, keys, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            self._sync()
+            fresh = {}
+            for key, vector in zip(keys, vectors):
+                if key not in self.rows:
+                    fresh.setdefault(key, vector)
+            if not fresh:
+                return
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.dim_path, "w") as f:
+                    f.write(str(self.dim))
+            start = self._stored
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.stack(list(fresh.values())).tobytes())
+            lines = "".join(f"{key} {start + offset}\n" for offset, key in enumerate(fresh)).encode("utf-8")
+            with open(self.keys_path, "ab") as f:
+                f.write(lines)
+            for offset, key in enumerate(fresh):
+                self.rows[key] = start + offset
+            self._stored = start + len(fresh)
+            self._keys_read += len(lines)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeds in fixed-size batches with a cap on in-flight batches and reuses every vector it has seen"""
+
+    def __init__(self, base, cache=None, batch_size=BATCH_SIZE, max_concurrency=MAX_CONCURRENT_BATCHES):
+        self.base = base
+        self.model = getattr(base, "model", type(base).__name__)
+        if cache is None:
+            cache = EmbeddingCache(os.path.join(CACHE_DIR, "embeddings", re.sub(r"\W+", "_", self.model)))
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.embedded = 0
+
+    def _key(self, text, kind):
+        return hashlib.sha256(f"{self.model}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _embed_batch(self, kind, texts):
+        if kind == "query":
+            return [self.base.embed_query(text) for text in texts]
+        return self.base.embed_documents(texts)
+
+    def _embed(self, texts, kind):
+        with span("embed", kind=kind, texts=len(texts)) as current:
+            return self._embed_cached(texts, kind, current)
+
+    def _embed_cached(self, texts, kind, current):
+        keys = [self._key(text, kind) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        current.set(computed=len(missing))
+        if missing:
+            pending = list(missing.items())
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(batches)))) as executor:
+                results = executor.map(lambda batch: self._embed_batch(kind, [text for _, text in batch]), batches)
+                for batch, batch_vectors in zip(batches, results):
+                    batch_keys = [key for key, _ in batch]
+                    self.cache.put_many(batch_keys, batch_vectors)
+                    vectors.update(zip(batch_keys, np.asarray(batch_vectors, dtype=np.float32)))
+                    self.embedded += len(batch)
+
+        return [np.asarray(vectors[key]).tolist() for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed(texts, "document")
+
+    def embed_query(self, text):
+        return self._embed([text], "query")[0]
+
+
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+
+def get_embeddings():
+    """Process-wide embeddings client, built once and shared by every session"""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            if EMBEDDING_BACKEND == "local":
+                base = HashEmbeddings()
+            else:
+                from langchain_google_genai import GoogleGenerativeAIEmbeddings
+                base = GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+            _embeddings = CachedEmbeddings(base)
+        return _embeddings
@@ -0,0 +1,242 @@
+import os
+import re
+import time
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from src.askpdf.embeddings import get_embeddings
+from src.askpdf.vector_store import IncrementalIndex, index_paths, load_manifest, read_vector_store
+from src.mcqgenerator.logger import logging
+
+INDEX_DIR = os.getenv("SCHOLARAI_INDEX_DIR", os.path.join("data", "indexes"))
+MAX_LOADED_INDEXES = int(os.getenv("SCHOLARAI_MAX_LOADED_INDEXES", "8"))
+DEFAULT_NAMESPACE = "default"
+# When set, namespaces nobody has opened or trained for this many days are deleted at start-up.
+# Off by default, the default namespace is never deleted.
+MAX_IDLE_DAYS = float(os.environ["SCHOLARAI_INDEX_MAX_IDLE_DAYS"]) if os.getenv("SCHOLARAI_INDEX_MAX_IDLE_DAYS") else None
+# Last use is recorded on the CURRENT file's mtime, at most this often per namespace
+TOUCH_INTERVAL = 300
+
+CURRENT_FILE = "CURRENT"
+# Generations kept on disk, older ones may still be mapped by a reader that has not refreshed yet
+KEEP_GENERATIONS = 2
+
+
+def safe_namespace(namespace):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace.strip()).strip("._") or DEFAULT_NAMESPACE
+
+
+class IndexManager:
+    """One vector index per user, session or class namespace under a data directory.
+
+    Every save writes a complete new generation directory and then atomically
+    repoints the namespace's CURRENT file at it, so readers never see a mix of
+    old and new files. At most `max_loaded` read-only indexes stay open, the least
+    recently used one is dropped first.
+    """
+
+    def __init__(self, embeddings, root=INDEX_DIR, max_loaded=MAX_LOADED_INDEXES):
+        self.embeddings = embeddings
+        self.root = os.path.abspath(root)
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_locks = {}
+        self._touched = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def namespace_dir(self, namespace):
+        return os.path.join(self.root, safe_namespace(namespace))
+
+    def current_dir(self, namespace):
+        try:
+            with open(os.path.join(self.namespace_dir(namespace), CURRENT_FILE), "r") as f:
+                generation = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return os.path.join(self.namespace_dir(namespace), generation)
+
+    def namespaces(self):
+        return sorted(
+            entry.name for entry in os.scandir(self.root)
+            if os.path.exists(os.path.join(entry.path, CURRENT_FILE))
+        )
+
+    def documents(self, namespace):
+        directory = self.current_dir(namespace)
+        if directory is None:
+            return {}
+        manifest = load_manifest(index_paths(directory)["manifest_path"])
+        return {doc_id: doc["name"] for doc_id, doc in manifest["documents"].items()}
+
+    def _touch(self, key):
+        now = time.time()
+        if now - self._touched.get(key, 0) < TOUCH_INTERVAL:
+            return
+        self._touched[key] = now
+        try:
+            os.utime(os.path.join(self.namespace_dir(key), CURRENT_FILE))
+        except FileNotFoundError:
+            pass
+
+    def last_used(self, namespace):
+        namespace_dir = self.namespace_dir(namespace)
+        for path in (os.path.join(namespace_dir, CURRENT_FILE), namespace_dir):
+            try:
+                return os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+        return None
+
+    def open(self, namespace):
+        """Return the read-only vector store of a namespace, or None if nothing was trained there"""
+        key = safe_namespace(namespace)
+        directory = self.current_dir(key)
+        if directory is None:
+            return None
+        self._touch(key)
+        with self._lock:
+            loaded = self._loaded.get(key)
+            if loaded is not None and loaded["directory"] == directory:
+                self._loaded.move_to_end(key)
+                return loaded["store"]
+
+        paths = index_paths(directory)
+        store = read_vector_store(self.embeddings, paths["index_path"], paths["chunks_path"])
+        generation = load_manifest(paths["manifest_path"])["generation"]
+        with self._lock:
+            self._loaded[key] = {"directory": directory, "generation": generation, "store": store}
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return store
+
+    def generation(self, namespace):
+        with self._lock:
+            loaded = self._loaded.get(safe_namespace(namespace))
+        if loaded is not None:
+            return loaded["generation"]
+        directory = self.current_dir(namespace)
+        if directory is None:
+            return 0
+        return load_manifest(index_paths(directory)["manifest_path"])["generation"]
+
+    def _write_lock(self, key):
+        with self._lock:
+            return self._write_locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def writing(self, namespace):
+        """Yield an IncrementalIndex for the namespace and publish it as a new generation on exit.
+
+        Writers of the same namespace are serialized, so two "Train & Process"
+        clicks cannot overwrite each other's documents.
+        """
+        key = safe_namespace(namespace)
+        with self._write_lock(key):
+            directory = self.current_dir(key)
+            if directory is None:
+                index = IncrementalIndex(self.embeddings, **index_paths(os.path.join(self.namespace_dir(key), "empty")))
+            else:
+                index = IncrementalIndex(self.embeddings, **index_paths(directory))
+            yield index
+            if index.dirty:
+                self._publish(key, index)
+
+    def _publish(self, key, index):
+        namespace_dir = self.namespace_dir(key)
+        generation = f"g{index.generation:08d}"
+        index.save(os.path.join(namespace_dir, generation))
+
+        current_path = os.path.join(namespace_dir, CURRENT_FILE)
+        tmp_path = f"{current_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(generation)
+        os.replace(tmp_path, current_path)
+
+        with self._lock:
+            self._loaded.pop(key, None)
+        self._touched[key] = time.time()
+        self._prune(namespace_dir)
+
+    def _prune(self, namespace_dir):
+        generations = sorted(
+            entry.name for entry in os.scandir(namespace_dir)
+            if entry.is_dir() and re.fullmatch(r"g\d+", entry.name)
+        )
+        for name in generations[:-KEEP_GENERATIONS]:
+            # A file that is still mapped cannot be removed on Windows, it is retried on the next publish
+            shutil.rmtree(os.path.join(namespace_dir, name), ignore_errors=True)
+
+    def drop(self, namespace):
+        key = safe_namespace(namespace)
+        with self._write_lock(key):
+            with self._lock:
+                self._loaded.pop(key, None)
+            shutil.rmtree(self.namespace_dir(key), ignore_errors=True)
+        self._touched.pop(key, None)
+
+    def drop_idle(self, max_idle_days):
+        """Delete namespaces that were not opened or trained for `max_idle_days`, returns their names"""
+        cutoff = time.time() - max_idle_days * 86400
+        dropped = []
+        for entry in os.scandir(self.root):
+            if not entry.is_dir() or entry.name == DEFAULT_NAMESPACE:
+                continue
+            last_used = self.last_used(entry.name)
+            if last_used is not None and last_used < cutoff:
+                self.drop(entry.name)
+                dropped.append(entry.name)
+        if dropped:
+            logging.info(f"Deleted {len(dropped)} idle index namespaces")
+        return dropped
+
+    def import_legacy(self, directory=".", namespace=DEFAULT_NAMESPACE):
+        """Publish an index saved by earlier versions in `directory` as the first generation of `namespace`.
+
+        Older releases kept one faiss_index.bin next to a pickled faiss_store.pkl
+        in the working directory. The pickle is migrated to a chunk store while
+        loading, and nothing happens once the namespace has an index of its own.
+        """
+        key = safe_namespace(namespace)
+        legacy = index_paths(directory)
+        if not os.path.exists(legacy["index_path"]):
+            return False
+        with self._write_lock(key):
+            if self.current_dir(key) is not None:
+                return False
+            index = IncrementalIndex(self.embeddings, **legacy)
+            if index.vector_store is None:
+                return False
+            self._publish(key, index)
+        logging.info(f"Imported the index in {os.path.abspath(directory)} into namespace {key}")
+        return True
+
+    def memory_usage(self):
+        """Approximate bytes held by each loaded index: vectors plus the chunk row table and text blob"""
+        usage = {}
+        with self._lock:
+            loaded = list(self._loaded.items())
+        for key, entry in loaded:
+            store = entry["store"]
+            vectors = store.index.ntotal * store.index.d * 4
+            chunks = store.docstore.nbytes
+            usage[key] = {"vectors": vectors, "chunks": chunks, "total": vectors + chunks}
+        return usage
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_index_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = IndexManager(get_embeddings())
+            _manager.import_legacy()
+            if MAX_IDLE_DAYS is not None:
+                _manager.drop_idle(MAX_IDLE_DAYS)
+        return _manager
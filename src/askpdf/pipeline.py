@@ -0,0 +1,191 @@
+import contextvars
+import os
+import queue
+import threading
+from bisect import bisect_right
+
+from src.core.extraction import iter_pdf_pages, read_bytes
+from src.core.text_cache import content_hash
+from src.askpdf.embeddings import BATCH_SIZE
+from src.core.tracing import span
+
+QUEUE_SIZE = int(os.getenv("SCHOLARAI_PIPELINE_QUEUE", "8"))
+# How much page text is buffered before it is split, a little over a chunk keeps the carry small
+FLUSH_CHARS = int(os.getenv("SCHOLARAI_PIPELINE_FLUSH_CHARS", "8000"))
+
+_DONE = object()
+
+
+def stream_chunks(pages, splitter, flush_chars=FLUSH_CHARS):
+    """Split a stream of page texts into (chunk, page_number) pairs.
+
+    Only a window of text is held at a time. The last chunk of every window is
+    carried into the next one so chunks still run across page boundaries, and
+    each chunk is attributed to the page it starts on. The splitter must be
+    created with add_start_index=True.
+    """
+    buffer = ""
+    page_starts = []
+    page_numbers = []
+
+    def split(final):
+        with span("chunk", chars=len(buffer)):
+            documents = splitter.create_documents([buffer])
+        emit = documents if final else documents[:-1]
+        for document in emit:
+            start = document.metadata["start_index"]
+            yield document.page_content, page_numbers[max(bisect_right(page_starts, start) - 1, 0)]
+        if final or not documents:
+            return None
+        return documents[-1].metadata["start_index"]
+
+    for page_number, text in enumerate(pages):
+        page_starts.append(len(buffer))
+        page_numbers.append(page_number)
+        buffer += text
+        if len(buffer) < flush_chars:
+            continue
+
+        carry = yield from split(final=False)
+        if carry:
+            buffer = buffer[carry:]
+            kept = [(start - carry, number) for start, number in zip(page_starts, page_numbers) if start >= carry]
+            # The page the carried text starts on is still its page
+            first = page_numbers[max(bisect_right(page_starts, carry) - 1, 0)]
+            page_starts = [0] + [start for start, _ in kept if start > 0]
+            page_numbers = [first] + [number for start, number in kept if start > 0]
+
+    if buffer:
+        yield from split(final=True)
+
+
+class _Worker(threading.Thread):
+    """Pipeline stage that forwards its exception downstream instead of dying silently"""
+
+    def __init__(self, target, output):
+        super().__init__(daemon=True)
+        self._target_fn = target
+        # Spans opened by the stage belong to the request that started it
+        self._context = contextvars.copy_context()
+        self.output = output
+        self.stop = threading.Event()
+
+    def get(self, source):
+        while not self.stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def put(self, item):
+        while not self.stop.is_set():
+            try:
+                self.output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        try:
+            self._context.run(self._target_fn, self)
+        except BaseException as e:
+            self.put(e)
+        self.put(_DONE)
+
+
+def ingest_stream(index, files, splitter, progress=None, batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE):
+    """Stream files through extract -> split -> embed -> index with bounded queues between stages.
+
+    Extraction and splitting run in one thread and embedding in another, while
+    vectors are added to `index` (an IncrementalIndex) on the calling thread, so
+    the three overlap and at most `queue_size` items wait between any two stages.
+    `progress` is called on the calling thread with a stats dict after every step.
+    Every stage updates the shared stats under one lock.
+    """
+    chunks = queue.Queue(maxsize=queue_size * batch_size)
+    vectors = queue.Queue(maxsize=queue_size)
+    stats = {"documents": len(files), "processed": 0, "skipped": 0, "pages": 0, "chunks": 0, "embedded": 0}
+    lock = threading.Lock()
+
+    def extract(worker):
+        for file in files:
+            if worker.stop.is_set():
+                return
+            name = getattr(file, "name", "document")
+            doc_id = content_hash(read_bytes(file))
+            with lock:
+                started = index.begin_document(doc_id, name)
+            if not started:
+                worker.put(("skip", doc_id))
+                continue
+
+            def pages():
+                for page in iter_pdf_pages(file):
+                    with lock:
+                        stats["pages"] += 1
+                    yield page
+
+            for chunk, page_number in stream_chunks(pages(), splitter):
+                if not worker.put(("chunk", doc_id, chunk, page_number)):
+                    return
+            worker.put(("end", doc_id))
+
+    def embed(worker):
+        batch = []
+
+        def flush():
+            if batch:
+                texts = [text for _, text, _ in batch]
+                worker.put(("vectors", list(batch), index.embeddings.embed_documents(texts)))
+                batch.clear()
+
+        while True:
+            item = worker.get(chunks)
+            if item is _DONE:
+                flush()
+                return
+            if isinstance(item, BaseException):
+                raise item
+            if item[0] == "chunk":
+                _, doc_id, text, page_number = item
+                with lock:
+                    stats["chunks"] += 1
+                    batch.extend(index.stage_chunks(doc_id, [text], [{"page": page_number}]))
+                if len(batch) >= batch_size:
+                    flush()
+            else:
+                # Vectors of a document must reach the index before the document is closed
+                flush()
+                worker.put(item)
+
+    extractor = _Worker(extract, chunks)
+    embedder = _Worker(embed, vectors)
+    extractor.start()
+    embedder.start()
+    try:
+        while True:
+            item = vectors.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            kind = item[0]
+            with lock:
+                if kind == "vectors":
+                    index.add_vectors(item[1], item[2])
+                    stats["embedded"] += len(item[1])
+                elif kind == "end":
+                    index.finish_document(item[1])
+                    stats["processed"] += 1
+                else:
+                    stats["skipped"] += 1
+                # The stage threads keep counting while progress runs
+                snapshot = dict(stats)
+            if progress is not None:
+                progress(snapshot)
+    finally:
+        extractor.stop.set()
+        embedder.stop.set()
+    return stats
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.prompts import PromptTemplate
+
+from src.core.tracing import LLMTracer
+
+QA_MODEL = "gemini-1.5-flash"
+
+prompt_template = """
+    Leave First 1 line empty and then give reply
+    1. Answer the question as detailed as possible from the provided context 
+    2. (if not in context search on Internet), 
+    3. make sure to provide all the details Properly, 
+    4. use pointers and tables to make context more readable. 
+    5. If information not found then search on google and then provide reply.
+    6. (but then mention the reference name)
+    7. If 'Summarize' word is used in input then Summarize the context.
+    8. If input is: 'Hello', reply: Hey hi Suraj.\n\n
+    9. Use Markdown font to make text more readable
+    
+    Context:\n {context}?\n
+    Question: \n{question}\n
+
+    Answer:
+    """
+
+# Separator between the retrieved chunks in the context, as in a "stuff" QA chain
+DOCUMENT_SEPARATOR = "\n\n"
+
+_lock = threading.Lock()
+_model = None
+_prompt = None
+
+
+def get_qa_model():
+    """Gemini chat client shared by every question in the process"""
+    global _model
+    with _lock:
+        if _model is None:
+            _model = ChatGoogleGenerativeAI(model=QA_MODEL, temperature=0.3, callbacks=[LLMTracer("ask_pdf")])
+        return _model
+
+
+def get_qa_prompt():
+    global _prompt
+    with _lock:
+        if _prompt is None:
+            _prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
+        return _prompt
+
+
+def stream_answer(docs, question, model=None):
+    """Yield the answer token by token, the retrieved chunks stuffed into the QA prompt"""
+    context = DOCUMENT_SEPARATOR.join(doc.page_content for doc in docs)
+    prompt_text = get_qa_prompt().format(context=context, question=question)
+    for chunk in (model or get_qa_model()).stream(prompt_text):
+        text = getattr(chunk, "content", chunk)
+        if isinstance(text, str) and text:
+            yield text
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeStreamingModel:
+    """Stand-in chat model for tests and benchmarks, streams canned answers word by word"""
+
+    def __init__(self, responses=("This is a test answer.",), delay=0.0, first_token_delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.first_token_delay = first_token_delay
+        self.prompts = []
+
+    def _next_response(self):
+        return self.responses[(len(self.prompts) - 1) % len(self.responses)]
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        time.sleep(self.first_token_delay)
+        words = self._next_response().split(" ")
+        for position, word in enumerate(words):
+            if position:
+                time.sleep(self.delay)
+            yield _Chunk(word if position == len(words) - 1 else word + " ")
+
+    def invoke(self, prompt):
+        return _Chunk("".join(chunk.content for chunk in self.stream(prompt)))
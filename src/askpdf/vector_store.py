@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import threading
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+from src.core.tracing import span
+from src.askpdf.chunk_store import (
+    ChunkStore,
+    MutableChunkStore,
+    chunk_store_exists,
+    migrate_pickle_store,
+    write_chunk_store,
+)
+
+INDEX_PATH = "faiss_index.bin"
+CHUNKS_PATH = "faiss_chunks"
+MANIFEST_PATH = "faiss_manifest.json"
+# Pickled docstore written by earlier versions, migrated to a chunk store on first load
+LEGACY_STORE_PATH = "faiss_store.pkl"
+
+LEGACY_DOCUMENT = "legacy"
+
+
+def chunk_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path, write):
+    # Readers keep whatever file they already opened or mapped, never a half written one
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_index(index_path):
+    flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    try:
+        return faiss.read_index(index_path, flag | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        # Older FAISS builds cannot map flat indexes
+        return faiss.read_index(index_path)
+
+
+def _ensure_chunk_store(chunks_path):
+    legacy_store_path = os.path.join(os.path.dirname(chunks_path), LEGACY_STORE_PATH)
+    if not chunk_store_exists(chunks_path) and os.path.exists(legacy_store_path):
+        migrate_pickle_store(legacy_store_path, chunks_path)
+    return chunk_store_exists(chunks_path)
+
+
+def index_paths(directory):
+    return {
+        "index_path": os.path.join(directory, INDEX_PATH),
+        "chunks_path": os.path.join(directory, CHUNKS_PATH),
+        "manifest_path": os.path.join(directory, MANIFEST_PATH),
+    }
+
+
+def read_vector_store(embeddings, index_path=INDEX_PATH, chunks_path=CHUNKS_PATH):
+    """Open a read-only vector store over a memory-mapped index and chunk store"""
+    index = _read_index(index_path)
+    docstore = ChunkStore(chunks_path)
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=docstore.ids(),
+    )
+
+
+def load_manifest(manifest_path=MANIFEST_PATH):
+    if not os.path.exists(manifest_path):
+        return {"generation": 0, "documents": {}}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class IncrementalIndex:
+    """Append-only FAISS index that ingests one document at a time.
+
+    Chunks are stored under their content hash, so a document or chunk that was
+    already embedded is skipped and only new vectors are added. The manifest
+    records which chunks belong to which document so a single document can be
+    removed again, and a generation number that changes on every write.
+    """
+
+    def __init__(self, embeddings, index_path=INDEX_PATH, chunks_path=CHUNKS_PATH, manifest_path=MANIFEST_PATH):
+        self.embeddings = embeddings
+        self.index_path = index_path
+        self.chunks_path = chunks_path
+        self.manifest_path = manifest_path
+        self.vector_store = None
+        self.manifest = {"generation": 0, "documents": {}}
+        self.dirty = False
+        self._known = None
+        self._open_documents = {}
+        self._load()
+
+    def _load(self):
+        self.manifest = load_manifest(self.manifest_path)
+
+        if os.path.exists(self.index_path) and _ensure_chunk_store(self.chunks_path):
+            index = faiss.read_index(self.index_path)
+            base = ChunkStore(self.chunks_path)
+            self.vector_store = FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=MutableChunkStore(base),
+                index_to_docstore_id=dict(base.ids().items()),
+            )
+            # An index written before the manifest existed is kept as one opaque document
+            if not self.manifest["documents"] and self.vector_store.index_to_docstore_id:
+                self.manifest["documents"][LEGACY_DOCUMENT] = {
+                    "name": "Previously trained documents",
+                    "chunks": list(self.vector_store.index_to_docstore_id.values()),
+                }
+        else:
+            # The manifest cannot describe vectors that are no longer on disk
+            self.manifest["documents"] = {}
+
+    @property
+    def generation(self):
+        return self.manifest["generation"]
+
+    def documents(self):
+        return {doc_id: doc["name"] for doc_id, doc in self.manifest["documents"].items()}
+
+    def has_document(self, doc_id):
+        return doc_id in self.manifest["documents"]
+
+    def _known_chunks(self):
+        if self._known is None:
+            self._known = set() if self.vector_store is None else set(self.vector_store.index_to_docstore_id.values())
+        return self._known
+
+    def begin_document(self, doc_id, name):
+        """Start streaming a document in, returns False if it is already indexed"""
+        if self.has_document(doc_id) or doc_id in self._open_documents:
+            return False
+        self._open_documents[doc_id] = {"name": name, "chunks": [], "seen": set()}
+        return True
+
+    def stage_chunks(self, doc_id, text_chunks, metadatas=None):
+        """Record chunks for an open document and return the (id, text, metadata) of those that still need vectors"""
+        document = self._open_documents[doc_id]
+        known = self._known_chunks()
+        pending = []
+        for position, chunk in enumerate(text_chunks):
+            key = chunk_hash(chunk)
+            if key in document["seen"]:
+                continue
+            document["seen"].add(key)
+            document["chunks"].append(key)
+            if key not in known:
+                known.add(key)
+                metadata = {"source": document["name"], "document": doc_id}
+                if metadatas is not None:
+                    metadata.update(metadatas[position])
+                pending.append((key, chunk, metadata))
+        return pending
+
+    def add_vectors(self, pending, vectors):
+        with span("index", op="add", vectors=len(pending)):
+            self._add_vectors(pending, vectors)
+
+    def _add_vectors(self, pending, vectors):
+        ids = [key for key, _, _ in pending]
+        text_embeddings = [(text, vector) for (_, text, _), vector in zip(pending, vectors)]
+        metadatas = [metadata for _, _, metadata in pending]
+        if self.vector_store is None:
+            self.vector_store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=ids)
+        else:
+            self.vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+
+    def finish_document(self, doc_id):
+        document = self._open_documents.pop(doc_id)
+        self.manifest["documents"][doc_id] = {"name": document["name"], "chunks": document["chunks"]}
+        self._bump()
+
+    def add_document(self, doc_id, name, text_chunks, metadatas=None):
+        """Index the chunks of one document and return how many of them had to be embedded"""
+        if not self.begin_document(doc_id, name):
+            return 0
+        pending = self.stage_chunks(doc_id, text_chunks, metadatas)
+        if pending:
+            self.add_vectors(pending, self.embeddings.embed_documents([text for _, text, _ in pending]))
+        self.finish_document(doc_id)
+        return len(pending)
+
+    def remove_document(self, doc_id):
+        """Drop a document's vectors, keeping chunks that other documents still share"""
+        document = self.manifest["documents"].pop(doc_id, None)
+        if document is None:
+            return 0
+
+        still_used = set()
+        for other in self.manifest["documents"].values():
+            still_used.update(other["chunks"])
+        known = self._known_chunks()
+        doomed = [key for key in document["chunks"] if key not in still_used and key in known]
+        if doomed:
+            self.vector_store.delete(doomed)
+            known.difference_update(doomed)
+        self._bump()
+        return len(doomed)
+
+    def _bump(self):
+        self.manifest["generation"] += 1
+        self.dirty = True
+
+    def save(self, directory=None):
+        """Write the index, chunk store and manifest, into `directory` when given"""
+        with span("index", op="save"):
+            self._save(directory)
+
+    def _save(self, directory):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            paths = index_paths(directory)
+            self.index_path = paths["index_path"]
+            self.chunks_path = paths["chunks_path"]
+            self.manifest_path = paths["manifest_path"]
+        if self.vector_store is not None:
+            _atomic_write(self.index_path, lambda path: faiss.write_index(self.vector_store.index, path))
+            ids = self.vector_store.index_to_docstore_id
+            docstore = self.vector_store.docstore
+            write_chunk_store(self.chunks_path, ((ids[i], docstore.search(ids[i])) for i in range(len(ids))))
+        _atomic_write(self.manifest_path, self._write_manifest)
+        self.dirty = False
+
+    def _write_manifest(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
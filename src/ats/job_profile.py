@@ -0,0 +1,186 @@
+import os
+import time
+import hashlib
+import threading
+from dataclasses import asdict, dataclass, field
+
+from src.ats.keywords import MAX_PHRASE_WORDS, REQUIRED_LIST_WEIGHT, KeywordScorer, extract_keywords, tokenize
+from src.core.llm_utils import call_with_retry, parse_json_object
+from src.core.text_cache import CACHE_DIR, DiskCache
+from src.mcqgenerator.logger import logging
+
+JOB_PROFILE_CACHE_ENABLED = os.getenv("SCHOLARAI_JOB_PROFILE_CACHE", "1") != "0"
+MAX_JOB_PROFILE_CACHE_BYTES = int(float(os.getenv("SCHOLARAI_JOB_PROFILE_CACHE_MB", "16")) * 1024 * 1024)
+# Profiles kept in memory as well, with their keyword scorers ready
+MAX_PROFILES_IN_MEMORY = 64
+# Attempts beyond the first at getting a parseable profile from the model
+RETRIES = int(os.getenv("SCHOLARAI_ATS_RETRIES", "2"))
+# A fallback profile (no parsed model reply) is never stored on disk and is only reused this long
+FALLBACK_TTL_SECONDS = 300
+# Skills listed in the compact form when the model did not name any
+LOCAL_SKILLS = 15
+# Keywords besides the skills that the compact form keeps, most important first
+COMPACT_KEYWORDS = 12
+# Scoring weight of a skill the model named as required, above anything the local extractor assigns
+SKILL_WEIGHT = REQUIRED_LIST_WEIGHT * 1.5
+# Bumped when the stored profile fields or the keyword weighting change
+PROFILE_FORMAT = 3
+
+PROFILE_PROMPT = '''
+            You're a skilled ATS (Applicant Tracking System) Scanner with a deep understanding of tech roles.
+            Read the job description once so that resumes can later be screened against a short profile of it.
+            description: {desc}
+            I want an output in one single string having the structure: {{"RequiredSkills": [], "Summary": ""}}.
+            RequiredSkills lists the must-have skills and technologies, Summary is the role, seniority and main duties in at most 3 sentences.
+            '''
+
+# Changes whenever the prompt is edited, so old profiles stop matching
+PROFILE_VERSION = hashlib.sha256(f"{PROFILE_FORMAT}{PROFILE_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+
+def description_hash(desc):
+    # Re-pasting the same description with different line breaks should hit the cache
+    return hashlib.sha256(" ".join(desc.split()).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class JobProfile:
+    """Everything evaluations need from a job description, worked out once per description"""
+    desc_hash: str
+    keywords: list
+    skills: list
+    summary: str
+    # False when the skills are local keywords standing in for a model reply that failed or was not asked for
+    from_model: bool = False
+    _scorer: KeywordScorer = field(default=None, repr=False, compare=False)
+
+    def compact(self):
+        """What the ATS prompts send in place of the raw description"""
+        skills = {skill.lower() for skill in self.skills}
+        extra = [term for term, _ in self.keywords if term not in skills][:COMPACT_KEYWORDS]
+        lines = [f"Role: {self.summary}"] if self.summary else []
+        lines.append(f"Required skills: {', '.join(self.skills) or 'none stated'}")
+        if extra:
+            lines.append(f"Other keywords: {', '.join(extra)}")
+        return "\n".join(lines)
+
+    def for_prompt(self, desc):
+        # A short description can be smaller than its profile, send whichever is shorter
+        compact = self.compact()
+        return compact if len(compact) < len(desc) else desc
+
+    def scoring_keywords(self):
+        """The local keywords with the model's required skills added or raised to SKILL_WEIGHT"""
+        weights = {term: weight for term, weight in self.keywords}
+        for skill in self.skills:
+            # Skills longer than a matchable phrase ("5+ years of Go") are left to the LLM
+            term = " ".join(tokenize(skill))
+            if term and len(term.split()) <= MAX_PHRASE_WORDS:
+                weights[term] = max(weights.get(term, 0.0), SKILL_WEIGHT)
+        return sorted(weights.items(), key=lambda item: -item[1])
+
+    def scorer(self):
+        if self._scorer is None:
+            self._scorer = KeywordScorer(None, keywords=self.scoring_keywords())
+        return self._scorer
+
+    def to_entry(self):
+        entry = asdict(self)
+        del entry["_scorer"]
+        return entry
+
+
+def _parse_profile(text):
+    data = parse_json_object(text, "job profile")
+    skills = data.get("RequiredSkills", [])
+    if not isinstance(skills, list):
+        raise ValueError("RequiredSkills is not a list")
+    return [str(skill).strip() for skill in skills if str(skill).strip()], str(data.get("Summary", "")).strip()
+
+
+def build_profile(desc, generate=None, retries=RETRIES, backoff=1.0):
+    """Parse a job description into a JobProfile.
+
+    Keywords always come from the local extractor. `generate(prompt)` returns
+    the model's reply text and is asked for the required skills and a short
+    summary, retried like an ATS evaluation when it fails or cannot be parsed.
+    Without it, or when every reply is unparseable, the top keywords stand in
+    for the skills and the profile has from_model=False.
+    """
+    keywords = extract_keywords(desc)
+    skills = [term for term, _ in keywords[:LOCAL_SKILLS]]
+    summary = ""
+    from_model = False
+    if generate is not None and desc.strip():
+        prompt = PROFILE_PROMPT.format(desc=desc)
+        try:
+            skills, summary = call_with_retry(lambda: _parse_profile(generate(prompt)), retries, backoff, "Job profile")
+            from_model = True
+        except ValueError as e:
+            logging.warning(f"Job profile response could not be parsed ({e}), using local keywords")
+    return JobProfile(description_hash(desc), [list(item) for item in keywords], skills, summary, from_model)
+
+
+_profile_cache = None
+_profiles = {}
+_profiles_lock = threading.Lock()
+# One lock per description being built, so concurrent first requests make a single LLM call
+_building = {}
+
+
+def get_profile_cache():
+    global _profile_cache
+    if _profile_cache is None:
+        _profile_cache = DiskCache(os.path.join(CACHE_DIR, "job_profiles"), max_bytes=MAX_JOB_PROFILE_CACHE_BYTES)
+    return _profile_cache
+
+
+def _remembered(key):
+    cached = _profiles.get(key)
+    if cached is None:
+        return None
+    profile, built_at = cached
+    if not profile.from_model and time.monotonic() - built_at > FALLBACK_TTL_SECONDS:
+        return None
+    return profile
+
+
+def get_job_profile(desc, generate=None):
+    """The cached JobProfile for `desc`, built with build_profile the first time the description is seen.
+
+    Only profiles parsed from a model reply are stored on disk. A fallback is
+    kept in memory for FALLBACK_TTL_SECONDS, then the model is asked again.
+    """
+    key = f"{description_hash(desc)}-{PROFILE_VERSION}"
+    with _profiles_lock:
+        profile = _remembered(key)
+        if profile is not None:
+            return profile
+        building = _building.setdefault(key, threading.Lock())
+
+    try:
+        with building:
+            with _profiles_lock:
+                profile = _remembered(key)
+            if profile is not None:
+                return profile
+
+            entry = get_profile_cache().get(key) if JOB_PROFILE_CACHE_ENABLED else None
+            if entry is not None:
+                profile = JobProfile(**entry)
+            else:
+                logging.info("Building the profile of a new job description")
+                profile = build_profile(desc, generate)
+                if JOB_PROFILE_CACHE_ENABLED and profile.from_model:
+                    get_profile_cache().put(key, profile.to_entry())
+
+            with _profiles_lock:
+                _profiles.pop(key, None)
+                if len(_profiles) >= MAX_PROFILES_IN_MEMORY:
+                    _profiles.pop(next(iter(_profiles)))
+                _profiles[key] = (profile, time.monotonic())
+    finally:
+        # Also when generate raised, so the next request can try again
+        with _profiles_lock:
+            _building.pop(key, None)
+    return profile
@@ -0,0 +1,193 @@
+import re
+import math
+
+import numpy as np
+
+# Longest keyword phrase matched, in words
+MAX_PHRASE_WORDS = 3
+# How many missing keywords a result lists, most important first
+MAX_MISSING = 15
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# "Requirements: Python, AWS" or a "Nice to have:" line, a short heading before a colon
+_HEADING = re.compile(r"^\s*([A-Za-z][\w'\u2019 /&-]{0,40}?)\s*:\s*(.*)$", re.DOTALL)
+# Skill lists are separated items within one line or sentence
+_LIST_SEPARATORS = re.compile(r"[,;\u2022|()\[\]]|\s-\s")
+_BULLET = re.compile(r"\s*[-*\u2022]\s")
+
+# How much a mention counts by the section it is in. Boilerplate sections are skipped.
+REQUIRED_LIST_WEIGHT = 3.0
+REQUIRED_WEIGHT = 2.0
+NICE_TO_HAVE_WEIGHT = 1.5
+BULLET_WEIGHT = 1.5
+PLAIN_WEIGHT = 1.0
+PHRASE_BOOST = 1.25
+
+# Checked in this order, so "About the role" is a duties heading and not company boilerplate
+_SECTION_CUES = (
+    ("nice", ("nice", "bonus", "plus", "preferred", "desirable")),
+    ("required", ("requirement", "qualification", "must", "skill", "stack", "need", "you have", "you bring", "looking for", "expertise")),
+    ("plain", ("role", "responsibilit", "you will", "you'll", "duties", "position")),
+    ("boilerplate", ("about", "offer", "benefit", "perk", "why", "culture", "who we are", "our company", "compensation", "salary", "equal", "diversity", "apply", "location")),
+)
+# Sentences that are about the employer, wherever they appear
+BOILERPLATE_CUES = (
+    "we value", "equal opportunity", "encourage applicants", "competitive salary", "stock options",
+    "we are a", "we're a", "we offer", "our mission", "learning budget",
+)
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+each either etc for from get good great has have having he her how i if in including into is it its
+job just like looking may more most must new not of on one or other our out over own per plus role
+same she should so some such than that the their them then there these they this those through to
+under up us use used using very via was we well were what when where which while who will with within
+would you your
+ability able advantage applicant applicants apply background benefits candidate candidates company
+degree deliver demonstrated desired environment excellent experience experienced expert familiarity
+familiar field help ideal join knowledge least level looking members minimum nice opportunity
+plus position preferred proficiency proficient proven qualification qualifications related
+required requirement requirements responsibilities responsible senior skill skills solid strong
+team teams understanding work working year years
+""".split())
+
+
+def tokenize(text):
+    return [token.rstrip(".-/") for token in _TOKEN.findall(text.lower())]
+
+
+def _is_keyword_token(token):
+    return token not in STOPWORDS and (len(token) > 1 or token in ("c", "r")) and any(char.isalpha() for char in token)
+
+
+def _ngrams(tokens, max_words=MAX_PHRASE_WORDS):
+    for size in range(1, max_words + 1):
+        for start in range(len(tokens) - size + 1):
+            yield " ".join(tokens[start:start + size])
+
+
+def _section_kind(heading):
+    heading = heading.lower()
+    for kind, cues in _SECTION_CUES:
+        if any(cue in heading for cue in cues):
+            return kind
+    return None
+
+
+def _weighted_sentences(desc):
+    """Yield (sentence, weight, is_list) for the parts of a description worth matching"""
+    section = "plain"
+    for line in desc.splitlines():
+        bullet = bool(_BULLET.match(line))
+        for sentence in _SENTENCE_END.split(line):
+            heading = None if bullet else _HEADING.match(sentence)
+            if heading and len(heading.group(1).split()) <= 5:
+                section = _section_kind(heading.group(1)) or section
+                sentence = heading.group(2)
+            if section == "boilerplate" or any(cue in sentence.lower() for cue in BOILERPLATE_CUES):
+                continue
+            is_list = len(_LIST_SEPARATORS.split(sentence)) > 1
+            if section == "required":
+                weight = REQUIRED_LIST_WEIGHT if is_list else REQUIRED_WEIGHT
+            elif section == "nice":
+                weight = NICE_TO_HAVE_WEIGHT
+            else:
+                weight = BULLET_WEIGHT if bullet else PLAIN_WEIGHT
+            yield sentence, weight, is_list or bullet
+
+
+def extract_keywords(desc, max_keywords=None):
+    """Weighted keywords and short phrases of a job description, most important first.
+
+    A term weighs what the most important section mentioning it is worth:
+    requirement lists most, then other requirement text, nice-to-haves,
+    bullets and plain text. About-us, benefits and similar boilerplate is
+    left out. Repeats add a little on top. Phrases come from list items and
+    bullets ("Python, machine learning, AWS") of up to MAX_PHRASE_WORDS
+    keyword words, and from word pairs the description repeats; a word only
+    stays a keyword of its own if it also appears outside its phrases.
+    """
+    occurrences = {}
+    weights = {}
+    first_seen = {}
+
+    def add(term, weight, times=1):
+        occurrences[term] = occurrences.get(term, 0) + times
+        weights[term] = max(weights.get(term, 0.0), weight)
+        first_seen.setdefault(term, len(first_seen))
+
+    pairs = {}
+    for sentence, weight, is_list in _weighted_sentences(desc):
+        tokens = tokenize(sentence)
+        for token in tokens:
+            if _is_keyword_token(token):
+                add(token, weight)
+        for left, right in zip(tokens, tokens[1:]):
+            if _is_keyword_token(left) and _is_keyword_token(right):
+                count, best = pairs.get(f"{left} {right}", (0, 0.0))
+                pairs[f"{left} {right}"] = (count + 1, max(best, weight))
+        if not is_list:
+            continue
+        for item in _LIST_SEPARATORS.split(sentence):
+            words = tokenize(item)
+            if 1 < len(words) <= MAX_PHRASE_WORDS and all(_is_keyword_token(word) for word in words):
+                add(" ".join(words), weight)
+
+    for pair, (count, weight) in pairs.items():
+        if count > 1 and pair not in occurrences:
+            add(pair, weight, count)
+
+    for term, count in list(occurrences.items()):
+        if " " in term:
+            for word in term.split():
+                occurrences[word] = occurrences.get(word, 0) - count
+
+    weighted = [
+        (term, weights[term] * (1 + 0.5 * math.log(count)) * (PHRASE_BOOST if " " in term else 1.0))
+        for term, count in occurrences.items()
+        if count >= 1
+    ]
+    weighted.sort(key=lambda item: (-item[1], first_seen[item[0]]))
+    return weighted[:max_keywords] if max_keywords else weighted
+
+
+class KeywordScorer:
+    """Scores resumes against the keywords of one job description, many resumes per matrix product.
+
+    `matrix(texts)` is a resumes x keywords 0/1 matrix built from the index pairs
+    of matched n-grams (the coordinate form of a sparse matrix), so its cost
+    grows with the words in the resumes, not with the vocabulary.
+    """
+
+    def __init__(self, desc, max_keywords=None, keywords=None):
+        weighted = keywords if keywords is not None else extract_keywords(desc, max_keywords)
+        self.keywords = [term for term, _ in weighted]
+        self.weights = np.array([weight for _, weight in weighted], dtype=np.float32)
+        self._index = {term: column for column, term in enumerate(self.keywords)}
+
+    def matrix(self, texts):
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            matched = {self._index[gram] for gram in _ngrams(tokenize(text)) if gram in self._index}
+            rows.extend([row] * len(matched))
+            columns.extend(matched)
+        present = np.zeros((len(texts), len(self.keywords)), dtype=np.float32)
+        present[np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)] = 1.0
+        return present
+
+    def evaluate(self, texts, max_missing=MAX_MISSING):
+        """ATS response dicts for `texts`, with an empty ProfileSummary for the LLM to write"""
+        present = self.matrix(texts)
+        totals = self.weights.sum() or 1.0
+        scores = present @ self.weights / totals * 100
+        # Keywords are ordered by weight, so the first missing ones matter most
+        missing = present == 0
+        return [
+            {
+                "PercentageMatch": f"{int(round(float(score)))}%",
+                "MissingKeywordsintheResume": [self.keywords[column] for column in np.flatnonzero(row)[:max_missing]],
+                "ProfileSummary": "",
+            }
+            for score, row in zip(scores, missing)
+        ]
@@ -0,0 +1,112 @@
+import io
+import os
+import csv
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.core.extraction import iter_extracted
+from src.core.llm_utils import call_with_retry, parse_json_object
+from src.mcqgenerator.logger import logging
+
+# LLM calls in flight at once, and how many times a failed or unparseable evaluation is retried
+MAX_CONCURRENCY = int(os.getenv("SCHOLARAI_ATS_CONCURRENCY", "4"))
+RETRIES = int(os.getenv("SCHOLARAI_ATS_RETRIES", "2"))
+# Keyword match (percent) a resume needs before it is sent to the LLM in a pre-scored batch
+LLM_CUTOFF = float(os.getenv("SCHOLARAI_ATS_LLM_CUTOFF", "0"))
+
+CSV_COLUMNS = ("Rank", "Resume", "PercentageMatch", "MissingKeywords", "ProfileSummary", "Error")
+
+
+def parse_evaluation(text):
+    """The {"PercentageMatch", "MissingKeywordsintheResume", "ProfileSummary"} dict in a model reply.
+
+    Raises ValueError when the reply holds no such JSON object, so callers can retry.
+    """
+    data = parse_json_object(text, "ATS")
+    if "PercentageMatch" not in data:
+        raise ValueError("ATS response is missing PercentageMatch")
+    data.setdefault("MissingKeywordsintheResume", [])
+    data.setdefault("ProfileSummary", "")
+    return data
+
+
+def match_score(percentage):
+    """72 for "72%", "72" or 72, and 0 when the model wrote something else"""
+    try:
+        return float(str(percentage).strip().rstrip("%"))
+    except ValueError:
+        return 0.0
+
+
+def evaluate_with_retry(evaluate, text, desc, retries=RETRIES, backoff=1.0):
+    """Call `evaluate(text, desc)`, retrying API errors and bad JSON with exponential backoff"""
+    return call_with_retry(lambda: evaluate(text, desc), retries, backoff, "ATS evaluation")
+
+
+def _result_row(name, evaluation=None, error=None):
+    evaluation = evaluation or {}
+    keywords = evaluation.get("MissingKeywordsintheResume", [])
+    return {
+        "Resume": name,
+        "PercentageMatch": evaluation.get("PercentageMatch", ""),
+        "Score": match_score(evaluation.get("PercentageMatch", 0)),
+        "MissingKeywords": ", ".join(keywords) if isinstance(keywords, list) else str(keywords),
+        "ProfileSummary": evaluation.get("ProfileSummary", ""),
+        "Error": error or "",
+    }
+
+
+def _screen_one(evaluate, name, text, desc, retries, backoff):
+    try:
+        return _result_row(name, evaluate_with_retry(evaluate, text, desc, retries, backoff))
+    except Exception as e:
+        logging.error(f"Giving up on resume {name}: {e}")
+        return _result_row(name, error=str(e))
+
+
+def screen_resumes(files, desc, evaluate, concurrency=MAX_CONCURRENCY, retries=RETRIES, backoff=1.0, scorer=None, cutoff=LLM_CUTOFF):
+    """Yield one result row per resume as soon as its evaluation finishes.
+
+    Resumes are extracted in parallel, and each one is handed to a pool of
+    `concurrency` threads calling `evaluate(text, desc)` as soon as its text is
+    ready. A resume that still fails after the retries yields a row with
+    Score 0 and the error, so one bad file does not stop the batch.
+
+    With a KeywordScorer as `scorer`, all resumes are first scored against the
+    job description keywords in one pass. Those matching less than `cutoff`
+    percent are yielded straight away without an LLM call, the rest are passed
+    on as `evaluate(text, desc, evaluation=keyword_evaluation)`.
+    """
+    files = list(files)
+    names = [getattr(file, "name", None) or f"resume-{index + 1}.pdf" for index, file in enumerate(files)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = []
+        if scorer is None:
+            for index, extracted in iter_extracted(files):
+                futures.append(pool.submit(_screen_one, evaluate, names[index], extracted.text, desc, retries, backoff))
+        else:
+            texts = {index: extracted.text for index, extracted in iter_extracted(files)}
+            order = sorted(texts)
+            for index, evaluation in zip(order, scorer.evaluate([texts[index] for index in order])):
+                if match_score(evaluation["PercentageMatch"]) < cutoff:
+                    evaluation["ProfileSummary"] = f"Not sent for AI review, keyword match is below {cutoff:g}%."
+                    yield _result_row(names[index], evaluation)
+                    continue
+                scored = partial(evaluate, evaluation=evaluation)
+                futures.append(pool.submit(_screen_one, scored, names[index], texts[index], desc, retries, backoff))
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def rank(rows):
+    """Rows ordered best match first, with a 1-based Rank column"""
+    ordered = sorted(rows, key=lambda row: (row["Error"] != "", -row["Score"], row["Resume"]))
+    return [{"Rank": position, **row} for position, row in enumerate(ordered, start=1)]
+
+
+def to_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rank(rows))
+    return buffer.getvalue()
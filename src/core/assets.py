@@ -0,0 +1,87 @@
+import json
+import os
+import re
+import threading
+
+# Stylesheet minification only drops comments and whitespace, so it is on by default
+MINIFY_ASSETS = os.getenv("SCHOLARAI_MINIFY_ASSETS", "1") != "0"
+# Lottie exporters can write coordinates with up to 15 decimals. Rounding them shrinks what
+# Streamlit sends to the browser on every rerun but changes the animation, so it only
+# happens when a precision is set, e.g. SCHOLARAI_LOTTIE_PRECISION=3.
+LOTTIE_PRECISION = int(os.environ["SCHOLARAI_LOTTIE_PRECISION"]) if os.getenv("SCHOLARAI_LOTTIE_PRECISION") else None
+# Colors ("c", gradients "g") are 0-1 fractions and keyframe easing ("i", "o") is a curve
+# sensitive to small changes, so these stay exact. Path tangents and opacity use the same
+# one-letter keys and are left unrounded along with them.
+LOTTIE_EXACT_KEYS = frozenset(("c", "g", "i", "o"))
+
+_lock = threading.Lock()
+_assets = {}
+
+
+def _load(path, kind, build):
+    """Return build(path), rebuilt only when the file's mtime or size changes.
+
+    Results are shared by every session in the process, callers must not mutate them.
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = (os.path.abspath(path), kind)
+    with _lock:
+        cached = _assets.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    value = build(path)
+    with _lock:
+        _assets[key] = (signature, value)
+    return value
+
+
+def _round_floats(value, precision):
+    if isinstance(value, float):
+        rounded = round(value, precision)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, dict):
+        return {key: item if key in LOTTIE_EXACT_KEYS else _round_floats(item, precision) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(item, precision) for item in value]
+    return value
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    # Only after ':', a space before it separates a descendant selector from a pseudo-class
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _read_lottie(path):
+    with open(path, encoding="utf-8") as f:
+        animation = json.load(f)
+    if LOTTIE_PRECISION is not None:
+        animation = _round_floats(animation, LOTTIE_PRECISION)
+    return animation
+
+
+def _read_style(path):
+    with open(path, encoding="utf-8") as f:
+        css = f.read()
+    if MINIFY_ASSETS:
+        css = minify_css(css)
+    return "<style>" + css + "</style>"
+
+
+def load_lottie(path):
+    """Parsed Lottie animation, read from disk once per process and again only after it changes"""
+    return _load(path, "lottie", _read_lottie)
+
+
+def load_style(path):
+    """Contents of a stylesheet wrapped in a <style> tag, ready for st.markdown"""
+    return _load(path, "style", _read_style)
+
+
+def clear_assets():
+    with _lock:
+        _assets.clear()
@@ -0,0 +1,217 @@
+import io
+import os
+import tempfile
+import uuid
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import PyPDF2
+
+from src.core.text_cache import content_hash, get_text_cache
+from src.mcqgenerator.logger import configure_worker
+from src.core.tracing import span, timed_iter
+
+# Documents shorter than this are extracted inline, the pool start-up costs more than it saves
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("SCHOLARAI_PARALLEL_PAGES", "16"))
+MAX_WORKERS = int(os.getenv("SCHOLARAI_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+
+_executor = None
+# The PDF a pool worker last opened, reused for every page range it gets from the same document
+_worker_reader = (None, None)
+
+
+@dataclass
+class ExtractedText:
+    """Text of a whole document plus the character offset where each page starts"""
+    text: str
+    page_offsets: list = field(default_factory=list)
+
+    @property
+    def page_count(self):
+        return len(self.page_offsets)
+
+    def page_of(self, offset):
+        """Return the 0-based page number that contains the given character offset"""
+        return max(bisect_right(self.page_offsets, offset) - 1, 0)
+
+    def pages(self):
+        bounds = self.page_offsets + [len(self.text)]
+        for start, end in zip(bounds, bounds[1:]):
+            yield self.text[start:end]
+
+
+def _get_executor():
+    # One pool per process, shared by every session and rerun
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=configure_worker)
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the worker pool, the next parallel extraction starts one with the current MAX_WORKERS"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+def _extract_range(path, start, stop):
+    # Runs in a pool worker: the document is read from disk once per worker, not pickled into every task
+    global _worker_reader
+    if _worker_reader[0] != path:
+        with open(path, "rb") as f:
+            _worker_reader = (path, PyPDF2.PdfReader(io.BytesIO(f.read())))
+    reader = _worker_reader[1]
+    return [str(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def _extract_document(data):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [str(page.extract_text() or "") for page in reader.pages]
+
+
+def _page_ranges(page_count, parts):
+    step = -(-page_count // parts)
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+
+def assemble_pages(pages):
+    """Join page texts in one pass and record where each page starts"""
+    offsets = []
+    position = 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page)
+    return ExtractedText("".join(pages), offsets)
+
+
+def read_bytes(file):
+    """Return the raw bytes of an uploaded file, a file object or a path"""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return file.read()
+
+
+def _iter_page_batches(data):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+
+    if page_count < PARALLEL_PAGE_THRESHOLD or MAX_WORKERS < 2:
+        for page in reader.pages:
+            yield [str(page.extract_text() or "")]
+        return
+
+    # The bytes are written to a temporary file once and the workers get its path with a contiguous run of pages
+    ranges = _page_ranges(page_count, MAX_WORKERS * 2)
+    executor = _get_executor()
+    # A fresh random name per call, so a worker never mistakes a new document for the one it cached
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix=f"scholarai-{uuid.uuid4().hex}-")
+    futures = []
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        futures = [executor.submit(_extract_range, path, start, stop) for start, stop in ranges]
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        try:
+            os.remove(path)
+        except OSError:
+            # Still open in a worker on Windows when the caller stopped early, the temp directory is cleaned by the OS
+            pass
+
+
+def extract_pdf_bytes(data):
+    pages = []
+    for batch in _iter_page_batches(data):
+        pages.extend(batch)
+    return assemble_pages(pages)
+
+
+def iter_pdf_pages(file, use_cache=True):
+    """Yield the text of each page in order as soon as it is extracted"""
+    data = read_bytes(file)
+    key = content_hash(data)
+    cache = get_text_cache() if use_cache else None
+    entry = cache.get(key) if cache is not None else None
+    if entry is not None:
+        yield from ExtractedText(entry["text"], entry["page_offsets"]).pages()
+        return
+
+    pages = []
+    for batch in timed_iter(_iter_page_batches(data), "extract"):
+        for page in batch:
+            pages.append(page)
+            yield page
+    if cache is not None:
+        extracted = assemble_pages(pages)
+        cache.put(key, {"text": extracted.text, "page_offsets": extracted.page_offsets})
+
+
+def extract_pdf(file, use_cache=True):
+    """Extract the text of a PDF, fanning pages out across a process pool for large documents.
+
+    Results are cached by a hash of the file bytes, so a repeat upload costs one hash and one file read.
+    """
+    data = read_bytes(file)
+    with span("extract", bytes=len(data)) as current:
+        if not use_cache:
+            return extract_pdf_bytes(data)
+
+        cache = get_text_cache()
+        key = content_hash(data)
+        entry = cache.get(key)
+        if entry is not None:
+            current.set(cached=True)
+            return ExtractedText(entry["text"], entry["page_offsets"])
+
+        extracted = extract_pdf_bytes(data)
+        current.set(cached=False, pages=extracted.page_count)
+        cache.put(key, {"text": extracted.text, "page_offsets": extracted.page_offsets})
+        return extracted
+
+
+def iter_extracted(files, use_cache=True):
+    """Yield (index, ExtractedText) for each file as soon as it is ready, cached documents first.
+
+    Meant for many short PDFs such as a stack of resumes: each uncached document
+    goes to one pool worker whole, so the parallelism is across documents.
+    """
+    cache = get_text_cache() if use_cache else None
+    executor = _get_executor() if MAX_WORKERS > 1 else None
+    pending = {}
+    for index, file in enumerate(files):
+        data = read_bytes(file)
+        key = content_hash(data)
+        entry = cache.get(key) if cache is not None else None
+        if entry is not None:
+            yield index, ExtractedText(entry["text"], entry["page_offsets"])
+        elif executor is None:
+            pending[index] = (key, _extract_document(data))
+        else:
+            pending[executor.submit(_extract_document, data)] = (index, key)
+
+    if executor is None:
+        done = ((index, key, pages) for index, (key, pages) in pending.items())
+    else:
+        done = ((*pending[future], future.result()) for future in as_completed(pending))
+    for index, key, pages in done:
+        extracted = assemble_pages(pages)
+        if cache is not None:
+            cache.put(key, {"text": extracted.text, "page_offsets": extracted.page_offsets})
+        yield index, extracted
+
+
+def extract_many(files, use_cache=True):
+    return [extract_pdf(file, use_cache=use_cache) for file in files]
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import logging
+import random
+import time
+
+logger = logging.getLogger("scholarai.llm")
+
+
+def json_object_text(text):
+    """The outermost {...} in a model reply, which often wraps it in prose or code fences, or "" if there is none"""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return ""
+    return text[start:end + 1]
+
+
+def parse_json_object(text, what="model"):
+    """json.loads of json_object_text(text), raising ValueError when the reply holds no JSON object"""
+    data = json_object_text(text)
+    if not data:
+        raise ValueError(f"No JSON object in the {what} response")
+    data = json.loads(data)
+    if not isinstance(data, dict):
+        raise ValueError(f"The {what} response is not a JSON object")
+    return data
+
+
+def retry_delay(attempt, backoff=1.0):
+    # Exponential with jitter, so parallel callers that failed together do not retry together
+    return backoff * 2 ** attempt * (1 + random.random())
+
+
+def call_with_retry(call, retries=2, backoff=1.0, what="LLM call"):
+    """Return call(), retrying API errors and unparseable replies `retries` times with exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = retry_delay(attempt, backoff)
+            logger.warning(f"{what} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+async def acall_with_retry(call, retries=2, backoff=1.0, what="LLM call"):
+    """call_with_retry for a coroutine function, sleeping without blocking the event loop"""
+    for attempt in range(retries + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = retry_delay(attempt, backoff)
+            logger.warning(f"{what} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_DIR = os.getenv("SCHOLARAI_CACHE_DIR", os.path.join("data", "cache"))
+MAX_CACHE_BYTES = int(float(os.getenv("SCHOLARAI_TEXT_CACHE_MB", "256")) * 1024 * 1024)
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class DiskCache:
+    """Directory of JSON entries keyed by a content hash.
+
+    Entries are touched on every hit so the file mtime doubles as the LRU clock,
+    the oldest entries are evicted once the directory grows past `max_bytes`.
+    With `ttl` (seconds) entries are also stored with their write time and an
+    entry older than that is dropped on the next read.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_CACHE_BYTES, ttl=None):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None:
+            if not isinstance(entry, dict) or time.time() - entry.get("written_at", 0) > self.ttl:
+                self._remove(path)
+                return None
+            entry = entry["entry"]
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if self.ttl is not None:
+            entry = {"written_at": time.time(), "entry": entry}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def size(self):
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def evict(self):
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, _, size in entries)
+            for _, path, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+
+    def clear(self):
+        for _, path, _ in self._entries():
+            self._remove(path)
+
+
+_default_cache = None
+
+
+def get_text_cache():
+    global _default_cache
+    if _default_cache is None:
+        # Extracted document text keyed by a hash of the uploaded bytes
+        _default_cache = DiskCache(os.path.join(CACHE_DIR, "text"))
+    return _default_cache
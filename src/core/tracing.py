@@ -0,0 +1,295 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+STAGES = ("extract", "chunk", "embed", "index", "retrieve", "llm", "render")
+
+# Upper bounds in seconds, from a cache hit to a long generation
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Written every METRICS_INTERVAL seconds and at exit when set, .json or Prometheus text otherwise
+METRICS_FILE = os.getenv("SCHOLARAI_METRICS_FILE")
+METRICS_INTERVAL = float(os.getenv("SCHOLARAI_METRICS_INTERVAL", "30"))
+# Log every finished span as one JSON line
+TRACE_LOG = os.getenv("SCHOLARAI_TRACE_LOG", "0") == "1"
+
+logger = logging.getLogger("scholarai.trace")
+
+_current_span = contextvars.ContextVar("scholarai_span", default=None)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """Latency histograms per (stage, feature) and token counters per (feature, direction)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.tokens = {}
+
+    def observe(self, stage, feature, seconds):
+        with self._lock:
+            histogram = self.histograms.get((stage, feature))
+            if histogram is None:
+                histogram = self.histograms[(stage, feature)] = Histogram()
+            histogram.observe(seconds)
+
+    def add_tokens(self, feature, input_tokens=0, output_tokens=0):
+        with self._lock:
+            for direction, count in (("input", input_tokens), ("output", output_tokens)):
+                if count:
+                    self.tokens[(feature, direction)] = self.tokens.get((feature, direction), 0) + count
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "stages": [
+                    {
+                        "stage": stage,
+                        "feature": feature,
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": {("+Inf" if bound == float("inf") else str(bound)): count for bound, count in histogram.cumulative()},
+                    }
+                    for (stage, feature), histogram in sorted(self.histograms.items())
+                ],
+                "tokens": [
+                    {"feature": feature, "direction": direction, "count": count}
+                    for (feature, direction), count in sorted(self.tokens.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP scholarai_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE scholarai_stage_seconds histogram",
+        ]
+        for entry in snapshot["stages"]:
+            labels = f'stage="{entry["stage"]}",feature="{entry["feature"]}"'
+            for bound, count in entry["buckets"].items():
+                lines.append(f'scholarai_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"scholarai_stage_seconds_sum{{{labels}}} {entry['sum']:.6f}")
+            lines.append(f"scholarai_stage_seconds_count{{{labels}}} {entry['count']}")
+        lines += [
+            "# HELP scholarai_llm_tokens_total Tokens sent to and received from the LLM.",
+            "# TYPE scholarai_llm_tokens_total counter",
+        ]
+        for entry in snapshot["tokens"]:
+            lines.append(f'scholarai_llm_tokens_total{{feature="{entry["feature"]}",direction="{entry["direction"]}"}} {entry["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the snapshot atomically, as JSON for a .json path and Prometheus text otherwise"""
+        if path.endswith(".json"):
+            body = json.dumps(self.snapshot(), indent=2)
+        else:
+            body = self.to_prometheus()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.tokens.clear()
+
+
+metrics = Metrics()
+
+
+class Span:
+    def __init__(self, stage, feature, attributes):
+        parent = _current_span.get()
+        self.stage = stage
+        self.feature = feature or (parent.feature if parent else "app")
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attributes = attributes
+        self.duration = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_tokens(self, input_tokens=0, output_tokens=0):
+        self.attributes["input_tokens"] = self.attributes.get("input_tokens", 0) + (input_tokens or 0)
+        self.attributes["output_tokens"] = self.attributes.get("output_tokens", 0) + (output_tokens or 0)
+        metrics.add_tokens(self.feature, input_tokens or 0, output_tokens or 0)
+
+
+@contextmanager
+def span(stage, feature=None, **attributes):
+    """Time a stage of a request. Nested spans share the trace id and inherit the feature.
+
+        with span("retrieve", "ask_pdf", k=4) as s:
+            docs = store.similarity_search(question)
+            s.set(hits=len(docs))
+    """
+    current = Span(stage, feature, attributes)
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        metrics.observe(stage, current.feature, current.duration)
+        if TRACE_LOG:
+            logger.info(json.dumps({
+                "trace": current.trace_id,
+                "stage": stage,
+                "feature": current.feature,
+                "ms": round(current.duration * 1000, 2),
+                "error": error,
+                **current.attributes,
+            }, default=str))
+
+
+@contextmanager
+def trace(feature):
+    """Attribute every span opened inside, on this thread, to `feature` without timing anything itself"""
+    token = _current_span.set(Span(None, feature, {}))
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def timed_iter(iterable, stage, feature=None, **attributes):
+    """Yield from `iterable`, recording only the time spent producing items as one `stage` span"""
+    parent = _current_span.get()
+    feature = feature or (parent.feature if parent else "app")
+    iterator = iter(iterable)
+    elapsed = 0.0
+    items = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                break
+            elapsed += time.perf_counter() - start
+            items += 1
+            yield item
+    finally:
+        metrics.observe(stage, feature, elapsed)
+        if TRACE_LOG:
+            logger.info(json.dumps({"stage": stage, "feature": feature, "ms": round(elapsed * 1000, 2), "items": items, **attributes}, default=str))
+
+
+def token_usage(response):
+    """(input, output) tokens from a LangChain message or a google.generativeai response, zeros if unknown"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return 0, 0
+    if isinstance(usage, dict):
+        return usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0
+    return getattr(usage, "prompt_token_count", 0) or 0, getattr(usage, "candidates_token_count", 0) or 0
+
+
+class LLMTracer(BaseCallbackHandler):
+    """LangChain callback that records an "llm" span with token counts for every model call"""
+
+    def __init__(self, feature):
+        self.feature = feature
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def _finish(self, run_id):
+        with self._lock:
+            start = self._started.pop(run_id, None)
+        return None if start is None else time.perf_counter() - start
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        seconds = self._finish(run_id)
+        if seconds is None:
+            return
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                used_in, used_out = token_usage(getattr(generation, "message", None))
+                input_tokens += used_in
+                output_tokens += used_out
+        metrics.observe("llm", self.feature, seconds)
+        metrics.add_tokens(self.feature, input_tokens, output_tokens)
+        if TRACE_LOG:
+            logger.info(json.dumps({
+                "stage": "llm",
+                "feature": self.feature,
+                "ms": round(seconds * 1000, 2),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+            }))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        seconds = self._finish(run_id)
+        if seconds is not None:
+            metrics.observe("llm", self.feature, seconds)
+
+
+_exporter = None
+
+
+def _export_forever():
+    while True:
+        time.sleep(METRICS_INTERVAL)
+        try:
+            metrics.export(METRICS_FILE)
+        except OSError:
+            logger.warning(f"Could not write metrics to {METRICS_FILE}")
+
+
+def start_metrics_export():
+    """Write the metrics snapshot to SCHOLARAI_METRICS_FILE periodically and at exit, once per process"""
+    global _exporter
+    if not METRICS_FILE or _exporter is not None:
+        return
+    _exporter = threading.Thread(target=_export_forever, name="metrics-export", daemon=True)
+    _exporter.start()
+    atexit.register(lambda: metrics.export(METRICS_FILE))
+
+
+start_metrics_export()
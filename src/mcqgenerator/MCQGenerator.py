@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 
 from src.mcqgenerator.utils import read_file , get_table_data
 from src.mcqgenerator.logger import logging
+from src.core.tracing import LLMTracer
 
 import langchain_google_genai as genai
 from langchain.prompts import PromptTemplate
@@ -16,7 +17,7 @@ load_dotenv()
 
 api_key = os.getenv("GOOGLE_API_KEY")
 
-llm = genai.ChatGoogleGenerativeAI(google_api_key=api_key , model = "gemini-1.5-flash")
+llm = genai.ChatGoogleGenerativeAI(google_api_key=api_key , model = "gemini-1.5-flash" , callbacks = [LLMTracer("mcq")])
 
 template = """
 Text:{text}
@@ -60,4 +61,27 @@ generate_evaluate_chain = SequentialChain(
     input_variables=["text", "number", "subject", "tone", "response_json"],
     output_variables=["quiz", "review"],
     verbose=True
-)
\ No newline at end of file
+)
+
+# Quiz and complexity review in one round trip, instead of quiz_chain then review_chain
+template3 = """
+Text:{text}
+You are an expert MCQ maker. Given the above text, it is your job to \
+create a quiz of {number} multiple choice questions for {subject} students in {tone} tone.
+Make sure the questions are not repeated and check all the questions to be conforming the text as well.
+Make sure to format the quiz like RESPONSE_JSON below and use it as a guide. \
+Ensure to make {number} MCQs.
+Then, as an expert English grammarian and writer, evaluate the complexity of the questions for {subject} students. \
+Use a maximum of 50 words for the complexity analysis.
+
+Reply with a single JSON object and nothing else, in this form:
+{{"quiz": <the quiz formatted like RESPONSE_JSON>, "review": "<complexity analysis>"}}
+### RESPONSE_JSON
+{response_json}
+
+"""
+
+fused_generation_prompt = PromptTemplate(
+    input_variables= ["text" , "number" , "subject" , "tone" , "response_json"],
+    template = template3
+)
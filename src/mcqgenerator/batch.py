@@ -0,0 +1,180 @@
+"""Generate MCQs for every PDF/TXT file in a folder without the Streamlit UI.
+
+    python -m src.mcqgenerator.batch course/ --number 10 --subject Biology --tone Simple --output quizzes.jsonl
+
+Files are extracted with read_file and quizzed with the same chain as the MCQ
+page, with at most --concurrency LLM calls in flight. Each result is appended to
+the JSONL output as soon as it is ready and recorded in a checkpoint manifest, so
+an interrupted run picks up where it stopped.
+"""
+import os
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+
+from src.mcqgenerator.utils import SUPPORTED_EXTENSIONS, extract_quiz_json, file_extension, read_file
+from src.mcqgenerator.logger import logging
+from src.core.llm_utils import acall_with_retry
+
+RESPONSE_JSON_PATH = "Response.json"
+
+
+class StubQuizChain:
+    """Offline stand-in for generate_evaluate_chain that builds a quiz from the text itself"""
+
+    def __init__(self, delay=0.0, failure_rate=0.0, seed=0):
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.random.random() < self.failure_rate:
+            raise RuntimeError("stub LLM failure")
+        sentences = [s.strip() for s in inputs["text"].split(".") if s.strip()] or ["Empty document"]
+        quiz = {}
+        for number in range(1, int(inputs["number"]) + 1):
+            sentence = sentences[(number - 1) % len(sentences)]
+            quiz[str(number)] = {
+                "mcq": f"Which statement about {inputs['subject']} appears in the text ({number})?",
+                "options": {"a": sentence[:80], "b": "None of the above", "c": "All of the above", "d": "Not stated"},
+                "correct": "a",
+            }
+        return {"quiz": "```json\n" + json.dumps(quiz) + "\n```", "review": "Stub review."}
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_documents(folder):
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if file_extension(name) in SUPPORTED_EXTENSIONS:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return read_file(f)
+
+
+def checkpoint_key(digest, subject, tone, number):
+    # The same file quizzed with other settings is a new job, not a finished one
+    return json.dumps([digest, subject, tone, number])
+
+
+class Checkpoint:
+    """Manifest of finished files keyed by content hash and quiz settings, rewritten atomically after every file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = json.load(f)
+
+    def is_done(self, key):
+        return key in self.done
+
+    def mark_done(self, key, path):
+        self.done[key] = path
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.done, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+async def generate_with_retry(chain, inputs, semaphore, retries=3, backoff=1.0):
+    """Call the chain with at most `semaphore` calls in flight, retrying failures and unparseable quizzes"""
+    async def generate():
+        async with semaphore:
+            response = await chain.ainvoke(inputs)
+        quiz = json.loads(extract_quiz_json(response["quiz"]))
+        return quiz, response.get("review", "")
+
+    return await acall_with_retry(generate, retries, backoff, "Quiz generation")
+
+
+async def run_batch(paths, output, checkpoint, chain, number, subject, tone, concurrency=4, retries=3, backoff=1.0):
+    with open(RESPONSE_JSON_PATH, "r") as file:
+        response_json = json.dumps(json.load(file))
+    semaphore = asyncio.Semaphore(concurrency)
+    write_lock = asyncio.Lock()
+    stats = {"done": 0, "skipped": 0, "failed": 0}
+
+    async def process(path):
+        digest = await asyncio.to_thread(file_digest, path)
+        key = checkpoint_key(digest, subject, tone, number)
+        if checkpoint.is_done(key):
+            stats["skipped"] += 1
+            return
+        try:
+            text = await asyncio.to_thread(_read, path)
+            quiz, review = await generate_with_retry(chain, {
+                "text": text,
+                "number": number,
+                "subject": subject,
+                "tone": tone,
+                "response_json": response_json,
+            }, semaphore, retries, backoff)
+        except Exception as e:
+            stats["failed"] += 1
+            logging.error(f"Giving up on {path}: {e}")
+            print(f"FAILED {path}: {e}")
+            return
+
+        record = {"file": path, "sha256": digest, "subject": subject, "tone": tone, "number": number, "quiz": quiz, "review": review}
+        async with write_lock:
+            with open(output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            checkpoint.mark_done(key, path)
+        stats["done"] += 1
+        print(f"done {path} ({len(quiz)} questions)")
+
+    await asyncio.gather(*(process(path) for path in paths))
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate MCQs for a folder of PDF/TXT files")
+    parser.add_argument("folder")
+    parser.add_argument("--output", default="quizzes.jsonl")
+    parser.add_argument("--manifest", help="checkpoint file, defaults to <output>.manifest.json")
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--subject", required=True)
+    parser.add_argument("--tone", default="Simple")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum LLM calls in flight")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=1.0, help="base delay in seconds between retries")
+    parser.add_argument("--stub", action="store_true", help="use the offline stub LLM instead of Gemini")
+    args = parser.parse_args(argv)
+
+    if args.stub:
+        chain = StubQuizChain()
+    else:
+        from src.mcqgenerator.MCQGenerator import generate_evaluate_chain
+        chain = generate_evaluate_chain
+
+    paths = find_documents(args.folder)
+    checkpoint = Checkpoint(args.manifest or args.output + ".manifest.json")
+    stats = asyncio.run(run_batch(
+        paths, args.output, checkpoint, chain, args.number, args.subject, args.tone,
+        concurrency=args.concurrency, retries=args.retries, backoff=args.backoff,
+    ))
+    print(f"{stats['done']} generated, {stats['skipped']} already done, {stats['failed']} failed")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,53 @@
+import atexit
 import logging
-import os 
-from datetime import datetime
+import logging.handlers
+import os
+import queue
 
-LOG_FILE  = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+LOG_FILE = "scholarai.log"
+# Size at which the log rolls over, and how many old files are kept
+MAX_LOG_BYTES = int(float(os.getenv("SCHOLARAI_LOG_MB", "10")) * 1024 * 1024)
+LOG_BACKUPS = int(os.getenv("SCHOLARAI_LOG_BACKUPS", "5"))
 
 log_path = os.path.join(os.getcwd(), "logs")
 os.makedirs(log_path , exist_ok = True)
 
 LOG_FILE_PATH = os.path.join(log_path , LOG_FILE)
+LOG_FORMAT = "[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s"
 
-logging.basicConfig(filename=LOG_FILE_PATH,
-                    level=logging.INFO,
-                    format = "[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s")
\ No newline at end of file
+
+def _configure():
+    # One file for the life of the process. Callers only put records on a queue,
+    # a listener thread does the formatting and disk writes.
+    root = logging.getLogger()
+    if any(isinstance(handler, logging.handlers.QueueHandler) for handler in root.handlers):
+        return
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE_PATH, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(logging.INFO)
+
+
+def configure_worker():
+    """Pool initializer that makes a worker process write its records straight to the log file.
+
+    A forked worker inherits the QueueHandler but not the listener thread, so
+    whatever it logged would wait on its copy of the queue forever. Only the
+    parent rotates the file; WatchedFileHandler reopens it after a rollover.
+    """
+    root = logging.getLogger()
+    for handler in [handler for handler in root.handlers if isinstance(handler, logging.handlers.QueueHandler)]:
+        root.removeHandler(handler)
+    file_handler = logging.handlers.WatchedFileHandler(LOG_FILE_PATH, encoding="utf-8", delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(file_handler)
+    root.setLevel(logging.INFO)
+
+
+_configure()
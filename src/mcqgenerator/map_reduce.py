@@ -0,0 +1,147 @@
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+from itertools import accumulate
+
+from src.mcqgenerator.utils import extract_quiz_json
+from src.mcqgenerator.logger import logging
+from src.mcqgenerator.MCQGenerator import quiz_chain, review_chain, generate_evaluate_chain
+from src.mcqgenerator.review import generate_fused
+
+# Documents longer than this are split into sections and quizzed section by section
+SECTION_CHARS = int(os.getenv("SCHOLARAI_MCQ_SECTION_CHARS", "12000"))
+MAX_PARALLEL_SECTIONS = int(os.getenv("SCHOLARAI_MCQ_PARALLEL_SECTIONS", "4"))
+
+MODES = ("auto", "single", "map_reduce")
+
+
+def split_sections(text, section_chars=SECTION_CHARS):
+    """Split text into sections of roughly `section_chars`, preferring paragraph and sentence breaks"""
+    sections = []
+    start = 0
+    while start < len(text):
+        end = min(start + section_chars, len(text))
+        if end < len(text):
+            window = text[start + section_chars // 2:end]
+            for separator in ("\n\n", "\n", ". "):
+                cut = window.rfind(separator)
+                if cut != -1:
+                    end = start + section_chars // 2 + cut + len(separator)
+                    break
+        section = text[start:end].strip()
+        if section:
+            sections.append(section)
+        start = end
+    return sections
+
+
+def allocate_questions(number, sections):
+    """Share `number` questions across sections in proportion to their length.
+
+    Question k is placed at the middle of the k-th of `number` equal stretches of
+    the document and goes to the section holding that point, so with fewer
+    questions than sections they are spread evenly over the whole text instead
+    of landing on the first sections.
+    """
+    ends = list(accumulate(len(section) for section in sections))
+    counts = [0] * len(sections)
+    for k in range(number):
+        position = (k + 0.5) * ends[-1] / number
+        counts[min(bisect_right(ends, position), len(sections) - 1)] += 1
+    return counts
+
+
+def normalize_question(question):
+    return re.sub(r"[^a-z0-9]+", " ", question.lower()).strip()
+
+
+def merge_quizzes(quizzes, number):
+    """Merge section quizzes into one RESPONSE_JSON shaped dict, dropping repeats and renumbering from 1"""
+    merged = {}
+    seen = set()
+    for quiz in quizzes:
+        for question in quiz.values():
+            key = normalize_question(question.get("mcq", ""))
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            merged[str(len(merged) + 1)] = question
+            if len(merged) == number:
+                return merged
+    return merged
+
+
+def _generate_section(section, count, subject, tone, response_json):
+    response = quiz_chain({
+        "text": section,
+        "number": count,
+        "subject": subject,
+        "tone": tone,
+        "response_json": response_json,
+    })
+    try:
+        return json.loads(extract_quiz_json(response["quiz"]))
+    except ValueError:
+        logging.warning("Skipping a section whose quiz could not be parsed")
+        return {}
+
+
+def generate_map_reduce(text, number, subject, tone, response_json, max_workers=MAX_PARALLEL_SECTIONS, section_chars=SECTION_CHARS, review=True):
+    """Quiz each section of a long document in parallel, then merge and review once.
+
+    Returns the same {"quiz", "review"} dict as generate_evaluate_chain, so callers
+    can use either. With `review=False` the review is left as None for the caller
+    to write later.
+    """
+    sections = split_sections(text, section_chars)
+    if len(sections) < 2:
+        return generate_quiz(text, number, subject, tone, response_json, mode="single", review_mode="sequential" if review else "async")
+    counts = allocate_questions(number, sections)
+    jobs = [(section, count) for section, count in zip(sections, counts) if count]
+    logging.info(f"Generating {number} MCQs from {len(jobs)} of {len(sections)} sections")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        quizzes = list(executor.map(lambda job: _generate_section(job[0], job[1], subject, tone, response_json), jobs))
+        merged = merge_quizzes(quizzes, number)
+
+        # One top-up round from the longest section if duplicates or bad sections left a gap
+        shortfall = number - len(merged)
+        if shortfall > 0:
+            longest = max(sections, key=len)
+            quizzes.append(executor.submit(_generate_section, longest, shortfall, subject, tone, response_json).result())
+            merged = merge_quizzes(quizzes, number)
+
+    quiz = json.dumps(merged)
+    if not review:
+        return {"quiz": quiz, "review": None}
+    return {"quiz": quiz, "review": review_chain({"subject": subject, "quiz": quiz})["review"]}
+
+
+def resolve_mode(text, mode="auto"):
+    if mode == "map_reduce" or (mode == "auto" and len(text) > SECTION_CHARS):
+        return "map_reduce"
+    return "single"
+
+
+def generate_quiz(text, number, subject, tone, response_json, mode="auto", review_mode="sequential"):
+    """Generate a quiz with one chain call, or section by section for long documents.
+
+    `review_mode` is one of review.REVIEW_MODES. Section by section quizzes have no
+    fused form and are reviewed after merging unless the review is deferred.
+    """
+    if resolve_mode(text, mode) == "map_reduce":
+        return generate_map_reduce(text, number, subject, tone, response_json, review=review_mode != "async")
+    if review_mode == "fused":
+        return generate_fused(text, number, subject, tone, response_json)
+    inputs = {
+        "text": text,
+        "number": number,
+        "subject": subject,
+        "tone": tone,
+        "response_json": response_json,
+    }
+    if review_mode == "async":
+        return {"quiz": quiz_chain(inputs)["quiz"], "review": None}
+    return generate_evaluate_chain(inputs)
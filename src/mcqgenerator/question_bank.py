@@ -0,0 +1,188 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+
+from src.mcqgenerator.utils import extract_quiz_json
+from src.mcqgenerator.logger import logging
+from src.mcqgenerator.map_reduce import normalize_question
+
+QUESTION_BANK_PATH = os.getenv("SCHOLARAI_QUESTION_BANK", os.path.join("data", "questionbank.db"))
+
+
+def document_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize_setting(value):
+    return value.strip().lower()
+
+
+class QuestionBank:
+    """Every generated MCQ, indexed by source document hash, subject and tone.
+
+    `served` remembers which questions each user has already been given, so a new
+    quiz is sampled from the questions they have not seen yet.
+    """
+
+    def __init__(self, db_name=QUESTION_BANK_PATH):
+        self.db_path = os.path.abspath(db_name)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # check_same_thread=False for Streamlit's threading model, the lock serializes access
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.setup_database()
+
+    def setup_database(self):
+        with self._lock:
+            self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc_hash TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                tone TEXT NOT NULL,
+                question_key TEXT NOT NULL,
+                mcq TEXT NOT NULL,
+                options TEXT NOT NULL,
+                correct TEXT NOT NULL,
+                times_served INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (doc_hash, subject, tone, question_key)
+            );
+            CREATE INDEX IF NOT EXISTS questions_by_request ON questions (doc_hash, subject, tone, times_served);
+            CREATE TABLE IF NOT EXISTS served (
+                user_id TEXT NOT NULL,
+                question_id INTEGER NOT NULL REFERENCES questions (id) ON DELETE CASCADE,
+                PRIMARY KEY (user_id, question_id)
+            );
+            ''')
+            self.conn.commit()
+
+    def add_questions(self, doc_hash, subject, tone, quiz):
+        """Store a RESPONSE_JSON shaped quiz and return [(id, question)], repeats map to the stored copy"""
+        subject, tone = _normalize_setting(subject), _normalize_setting(tone)
+        stored = []
+        with self._lock:
+            for question in quiz.values():
+                key = normalize_question(question.get("mcq", ""))
+                if not key or "options" not in question or "correct" not in question:
+                    continue
+                self.conn.execute('''
+                    INSERT OR IGNORE INTO questions (doc_hash, subject, tone, question_key, mcq, options, correct)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (doc_hash, subject, tone, key, question["mcq"], json.dumps(question["options"]), question["correct"]))
+                row = self.conn.execute('''
+                    SELECT id FROM questions WHERE doc_hash = ? AND subject = ? AND tone = ? AND question_key = ?
+                ''', (doc_hash, subject, tone, key)).fetchone()
+                stored.append((row[0], question))
+            self.conn.commit()
+        return stored
+
+    def sample(self, doc_hash, subject, tone, count, user_id=None):
+        """Up to `count` questions the user has not been served, least used first"""
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT id, mcq, options, correct FROM questions
+                WHERE doc_hash = ? AND subject = ? AND tone = ?
+                AND id NOT IN (SELECT question_id FROM served WHERE user_id = ?)
+                ORDER BY times_served, RANDOM()
+                LIMIT ?
+            ''', (doc_hash, _normalize_setting(subject), _normalize_setting(tone), user_id or "", count)).fetchall()
+        return [(id, {"mcq": mcq, "options": json.loads(options), "correct": correct}) for id, mcq, options, correct in rows]
+
+    def mark_served(self, question_ids, user_id=None):
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE questions SET times_served = times_served + 1 WHERE id = ?",
+                [(id,) for id in question_ids],
+            )
+            if user_id:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO served (user_id, question_id) VALUES (?, ?)",
+                    [(user_id, id) for id in question_ids],
+                )
+            self.conn.commit()
+
+    def served_to(self, user_id, question_ids):
+        if not user_id or not question_ids:
+            return set()
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT question_id FROM served WHERE user_id = ? AND question_id IN ({','.join('?' * len(question_ids))})",
+                [user_id, *question_ids],
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def count(self, doc_hash, subject, tone):
+        with self._lock:
+            return self.conn.execute('''
+                SELECT COUNT(*) FROM questions WHERE doc_hash = ? AND subject = ? AND tone = ?
+            ''', (doc_hash, _normalize_setting(subject), _normalize_setting(tone))).fetchone()[0]
+
+    def __del__(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+_question_bank = None
+_question_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    global _question_bank
+    with _question_bank_lock:
+        if _question_bank is None:
+            _question_bank = QuestionBank()
+        return _question_bank
+
+
+def fill_quiz(bank, text, number, subject, tone, generate, user_id=None, reuse=True):
+    """Serve a quiz from the bank, calling `generate(count)` only for the questions it is missing.
+
+    `generate` returns the usual {"quiz", "review"} response for `count` new
+    questions. Whatever it produces is added to the bank before the quiz is put
+    together, so the next request for the same document can reuse it. The result
+    is a {"quiz", "review", "from_bank"} dict. The review is None, to be written
+    later over the whole quiz, whenever any question came from the bank, since a
+    generated review only covers the new questions; it is also None when the
+    generator left it for later. `reuse=False` generates the whole quiz but still
+    banks it.
+
+    Questions already served to `user_id` are skipped, so on its own the bank
+    answers a repeated request with new questions from the LLM; the quiz cache in
+    front of it (quiz_cache.cached_fill_quiz) serves exact repeats.
+    """
+    doc_hash = document_hash(text)
+    banked = bank.sample(doc_hash, subject, tone, number, user_id) if reuse else []
+    chosen = list(banked)
+    review = None
+    shortfall = number - len(banked)
+    if shortfall > 0:
+        logging.info(f"Question bank had {len(banked)} of {number} questions, generating {shortfall}")
+        response = generate(shortfall)
+        if not banked:
+            review = response.get("review", "")
+        try:
+            generated = json.loads(extract_quiz_json(response["quiz"]))
+        except ValueError:
+            logging.warning("Generated quiz could not be parsed, serving the banked questions only")
+            generated = {}
+        stored = bank.add_questions(doc_hash, subject, tone, generated)
+        # The model can repeat a question this user was given before
+        seen = {id for id, _ in banked} | bank.served_to(user_id, [id for id, _ in stored])
+        for id, question in stored:
+            if id not in seen and len(chosen) < number:
+                seen.add(id)
+                chosen.append((id, question))
+        if not chosen:
+            # Nothing usable, hand the raw output back so the caller reports it as before
+            return {"quiz": response["quiz"], "review": response.get("review", ""), "from_bank": 0}
+    else:
+        logging.info(f"Serving all {number} questions from the question bank")
+
+    bank.mark_served([id for id, _ in chosen], user_id)
+    quiz = {str(position): question for position, (_, question) in enumerate(chosen, start=1)}
+    return {"quiz": json.dumps(quiz), "review": review, "from_bank": len(banked)}
@@ -0,0 +1,74 @@
+import os
+import json
+import hashlib
+
+from src.core.text_cache import CACHE_DIR, DiskCache
+from src.mcqgenerator.utils import extract_quiz_json
+from src.mcqgenerator.logger import logging
+from src.mcqgenerator.MCQGenerator import template, template2, template3
+
+MCQ_CACHE_ENABLED = os.getenv("SCHOLARAI_MCQ_CACHE", "1") != "0"
+MAX_MCQ_CACHE_BYTES = int(float(os.getenv("SCHOLARAI_MCQ_CACHE_MB", "64")) * 1024 * 1024)
+
+# Changes whenever a prompt is edited, so old quizzes stop matching
+PROMPT_VERSION = hashlib.sha256((template + template2 + template3).encode("utf-8")).hexdigest()[:12]
+
+_quiz_cache = None
+
+
+def get_quiz_cache():
+    global _quiz_cache
+    if _quiz_cache is None:
+        _quiz_cache = DiskCache(os.path.join(CACHE_DIR, "mcq"), max_bytes=MAX_MCQ_CACHE_BYTES)
+    return _quiz_cache
+
+
+def quiz_cache_key(text, number, subject, tone, mode, review_mode="sequential"):
+    parts = [
+        hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        int(number),
+        subject.strip().lower(),
+        tone.strip().lower(),
+        mode,
+        # Sequential and background reviews see the same quiz prompt, the fused one does not
+        "fused" if review_mode == "fused" else "separate",
+        PROMPT_VERSION,
+    ]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def lookup_quiz(key):
+    """The stored {"quiz", "review"} of an exact repeat, or None"""
+    if not MCQ_CACHE_ENABLED:
+        return None
+    entry = get_quiz_cache().get(key)
+    if entry is None:
+        return None
+    logging.info("Serving MCQs from the quiz cache")
+    return {"quiz": json.dumps(entry["quiz"]), "review": entry["review"]}
+
+
+def store_quiz(key, response):
+    """Keep a finished quiz and its review, a quiz whose review is still being written is stored once it is done"""
+    if not MCQ_CACHE_ENABLED or not isinstance(response, dict) or response.get("review") is None:
+        return
+    try:
+        quiz = json.loads(extract_quiz_json(response["quiz"]))
+    except ValueError:
+        # Unparseable output is returned to the caller as before but never cached
+        return
+    get_quiz_cache().put(key, {"quiz": quiz, "review": response["review"]})
+
+
+def cached_fill_quiz(key, fill, use_cache=True):
+    """`fill()` (usually question_bank.fill_quiz) with the quiz cache in front, an exact repeat costs no LLM calls.
+
+    `use_cache=False` always calls `fill` and refreshes the stored entry.
+    """
+    if use_cache:
+        response = lookup_quiz(key)
+        if response is not None:
+            return {**response, "from_bank": 0}
+    response = fill()
+    store_quiz(key, response)
+    return response
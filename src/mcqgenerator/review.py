@@ -0,0 +1,84 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.mcqgenerator.utils import extract_quiz_json
+from src.mcqgenerator.logger import logging
+from src.mcqgenerator.MCQGenerator import (
+    llm as default_llm,
+    quiz_generation_prompt,
+    quiz_evaluation_prompt,
+    fused_generation_prompt,
+)
+
+# sequential: quiz call, then review call (generate_evaluate_chain)
+# fused:      one call returns both the quiz and the review
+# async:      quiz call only, the review is written in the background after the quiz is shown
+REVIEW_MODES = ("sequential", "fused", "async")
+
+MAX_BACKGROUND_REVIEWS = int(os.getenv("SCHOLARAI_MCQ_BACKGROUND_REVIEWS", "4"))
+
+_review_lock = threading.Lock()
+_review_executor = None
+
+
+def _complete(prompt, llm=None):
+    message = (llm or default_llm).invoke(prompt)
+    return getattr(message, "content", message)
+
+
+def split_fused_output(output):
+    """Turn the fused {"quiz": {...}, "review": "..."} reply into the usual {"quiz", "review"} dict.
+
+    A reply that is only the quiz is kept with an empty review, and one that is not
+    JSON at all is passed through as the quiz so callers report it as before.
+    """
+    try:
+        data = json.loads(extract_quiz_json(output))
+    except ValueError:
+        logging.warning("Fused quiz output is not valid JSON")
+        return {"quiz": output, "review": ""}
+    if isinstance(data, dict) and isinstance(data.get("quiz"), dict):
+        return {"quiz": json.dumps(data["quiz"]), "review": str(data.get("review", ""))}
+    return {"quiz": output, "review": ""}
+
+
+def generate_quiz_only(text, number, subject, tone, response_json, llm=None):
+    prompt = quiz_generation_prompt.format(text=text, number=number, subject=subject, tone=tone, response_json=response_json)
+    return _complete(prompt, llm)
+
+
+def review_quiz(subject, quiz, llm=None):
+    return _complete(quiz_evaluation_prompt.format(subject=subject, quiz=quiz), llm)
+
+
+def generate_sequential(text, number, subject, tone, response_json, llm=None):
+    """The two calls generate_evaluate_chain makes, for callers that bring their own llm"""
+    quiz = generate_quiz_only(text, number, subject, tone, response_json, llm)
+    return {"quiz": quiz, "review": review_quiz(subject, quiz, llm)}
+
+
+def generate_fused(text, number, subject, tone, response_json, llm=None):
+    """Quiz and complexity review from a single LLM call"""
+    prompt = fused_generation_prompt.format(text=text, number=number, subject=subject, tone=tone, response_json=response_json)
+    return split_fused_output(_complete(prompt, llm))
+
+
+def start_review(subject, quiz, llm=None, on_done=None):
+    """Write the review on a background thread and return its Future.
+
+    `on_done(review)` runs on that thread once the review succeeds.
+    """
+    global _review_executor
+    with _review_lock:
+        if _review_executor is None:
+            _review_executor = ThreadPoolExecutor(max_workers=MAX_BACKGROUND_REVIEWS, thread_name_prefix="mcq-review")
+
+    def run():
+        review = review_quiz(subject, quiz, llm)
+        if on_done is not None:
+            on_done(review)
+        return review
+
+    return _review_executor.submit(run)
@@ -0,0 +1,90 @@
+import json
+
+from src.mcqgenerator.logger import logging
+from src.mcqgenerator.MCQGenerator import llm as default_llm, quiz_generation_prompt
+
+
+class QuizStreamParser:
+    """Incremental parser for the RESPONSE_JSON quiz object.
+
+    Feed it the model output piece by piece and it yields (question_num, question)
+    for every question object as soon as its closing brace arrives. Prose and code
+    fences before the opening brace and anything after the closing one are ignored,
+    and so is a balanced {...} in the leading prose: an object that closes without
+    yielding a question is dropped and parsing starts over. An unbalanced brace in
+    the prose before the quiz still hides every question after it.
+    Only the text of the question currently being read is buffered.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.done = False
+        self.questions = 0
+        self.in_string = False
+        self.escape = False
+        self._key = []
+        self._last_key = None
+        self._value = []
+
+    def feed(self, text):
+        for char in text:
+            if self.done:
+                return
+            if self.depth >= 2:
+                self._value.append(char)
+
+            if self.in_string:
+                if self.depth == 1:
+                    self._key.append(char)
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._last_key = json.loads('"' + "".join(self._key))
+                continue
+
+            if char == '"' and self.depth >= 1:
+                self.in_string = True
+                self._key = []
+            elif char == "{":
+                self.depth += 1
+                if self.depth == 2:
+                    self._value = ["{"]
+            elif char == "}" and self.depth >= 1:
+                self.depth -= 1
+                if self.depth == 1:
+                    question = self._parse_value()
+                    if question is not None:
+                        self.questions += 1
+                        yield self._last_key, question
+                elif self.depth == 0:
+                    # "{topic}" in the prose before the quiz is not the quiz, keep looking
+                    self.done = self.questions > 0
+
+    def _parse_value(self):
+        try:
+            return json.loads("".join(self._value))
+        except ValueError:
+            logging.warning("Skipping a streamed question that is not valid JSON")
+            return None
+        finally:
+            self._value = []
+
+
+def iter_quiz_questions(pieces):
+    """Yield (question_num, question) pairs from an iterable of streamed text pieces"""
+    parser = QuizStreamParser()
+    for piece in pieces:
+        yield from parser.feed(piece)
+
+
+def stream_quiz(text, number, subject, tone, response_json, llm=None):
+    """Stream the raw quiz_chain output for one document, piece by piece"""
+    prompt = quiz_generation_prompt.format(text=text, number=number, subject=subject, tone=tone, response_json=response_json)
+    for chunk in (llm or default_llm).stream(prompt):
+        content = getattr(chunk, "content", chunk)
+        if isinstance(content, str) and content:
+            yield content
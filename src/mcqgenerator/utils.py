@@ -2,24 +2,33 @@ import os
 import json
 import PyPDF2
 import traceback
+from src.core.extraction import extract_pdf
+from src.core.llm_utils import json_object_text
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+
+def file_extension(name):
+    # "Notes.PDF" and "notes.pdf" are the same format
+    return os.path.splitext(name)[1].lower()
 
 def read_file(file):
-    if file.name.endswith(".pdf"):
+    extension = file_extension(file.name)
+    if extension == ".pdf":
         try:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            return extract_pdf(file).text
         except Exception as e:
             raise Exception(f"Error reading pdf file: {e}")
     
-    elif file.name.endswith("txt"):
+    elif extension == ".txt":
         return file.read().decode("utf-8")
     
     else:
         raise Exception("Invalid file format. Only .txt and .pdf files are supported")
     
+def extract_quiz_json(quiz_str):
+    """Cut the JSON object out of the model output, which often wraps it in prose or code fences"""
+    return json_object_text(quiz_str)
+
 def get_table_data(quiz_str):
     try:
         # convert the quiz from a str to dict
@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+
+from src.core.text_cache import CACHE_DIR, DiskCache
+from src.mcqgenerator.logger import logging
+from src.notes.summarizer import MAP_PROMPT, REDUCE_FAN_IN, REDUCE_PROMPT, SECTION_CHARS, TIMESTAMP_NOTE, transcript_text
+from src.notes.transcripts import get_transcript_source
+
+NOTES_CACHE_ENABLED = os.getenv("SCHOLARAI_NOTES_CACHE", "1") != "0"
+# Captions rarely change once published, notes are only as fresh as their prompt version
+TRANSCRIPT_TTL_SECONDS = float(os.getenv("SCHOLARAI_TRANSCRIPT_TTL", str(7 * 24 * 3600)))
+NOTES_TTL_SECONDS = float(os.getenv("SCHOLARAI_NOTES_TTL", str(30 * 24 * 3600)))
+MAX_TRANSCRIPT_CACHE_BYTES = int(float(os.getenv("SCHOLARAI_TRANSCRIPT_CACHE_MB", "128")) * 1024 * 1024)
+MAX_NOTES_CACHE_BYTES = int(float(os.getenv("SCHOLARAI_NOTES_CACHE_MB", "32")) * 1024 * 1024)
+
+_transcript_cache = None
+_notes_cache = None
+
+
+def get_transcript_cache():
+    global _transcript_cache
+    if _transcript_cache is None:
+        _transcript_cache = DiskCache(os.path.join(CACHE_DIR, "transcripts"), max_bytes=MAX_TRANSCRIPT_CACHE_BYTES, ttl=TRANSCRIPT_TTL_SECONDS)
+    return _transcript_cache
+
+
+def get_notes_cache():
+    global _notes_cache
+    if _notes_cache is None:
+        _notes_cache = DiskCache(os.path.join(CACHE_DIR, "notes"), max_bytes=MAX_NOTES_CACHE_BYTES, ttl=NOTES_TTL_SECONDS)
+    return _notes_cache
+
+
+def prompt_version(prompt):
+    """Changes whenever the page prompt, the map-reduce prompts or their section sizes change"""
+    parts = [prompt, TIMESTAMP_NOTE, MAP_PROMPT, REDUCE_PROMPT, SECTION_CHARS, REDUCE_FAN_IN]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def _video_key(video_id):
+    return hashlib.sha256(video_id.strip().encode("utf-8")).hexdigest()
+
+
+def cached_transcript(video_id, source=None, use_cache=True):
+    """Caption segments of a video, fetched from `source` (YouTube by default) only on a cache miss"""
+    key = _video_key(video_id)
+    if use_cache and NOTES_CACHE_ENABLED:
+        segments = get_transcript_cache().get(key)
+        if segments is not None:
+            logging.info(f"Serving the transcript of {video_id} from the cache")
+            return segments
+
+    segments = (source or get_transcript_source())(video_id)
+    if NOTES_CACHE_ENABLED and segments:
+        get_transcript_cache().put(key, segments)
+    return segments
+
+
+def notes_cache_key(video_id, segments, prompt):
+    parts = [
+        _video_key(video_id),
+        # Re-published captions make new notes
+        hashlib.sha256(transcript_text(segments).encode("utf-8")).hexdigest(),
+        prompt_version(prompt),
+    ]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def cached_notes(video_id, segments, prompt, summarize, use_cache=True):
+    """`summarize(segments)` with a disk cache in front, a popular video is summarized once per prompt version.
+
+    `use_cache=False` always regenerates and refreshes the stored notes.
+    """
+    key = notes_cache_key(video_id, segments, prompt)
+    if use_cache and NOTES_CACHE_ENABLED:
+        entry = get_notes_cache().get(key)
+        if entry is not None:
+            logging.info(f"Serving the notes of {video_id} from the cache")
+            return entry["notes"]
+
+    notes = summarize(segments)
+    if NOTES_CACHE_ENABLED and notes:
+        get_notes_cache().put(key, {"video_id": video_id, "notes": notes})
+    return notes
@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.mcqgenerator.logger import logging
+
+# Transcripts longer than this are summarized section by section
+SECTION_CHARS = int(os.getenv("SCHOLARAI_NOTES_SECTION_CHARS", "20000"))
+MAX_PARALLEL_SECTIONS = int(os.getenv("SCHOLARAI_NOTES_PARALLEL_SECTIONS", "4"))
+# Partial notes merged per reduce call
+REDUCE_FAN_IN = int(os.getenv("SCHOLARAI_NOTES_FAN_IN", "6"))
+# A [m:ss] marker goes into the text at the first caption of every MARKER_SECONDS
+MARKER_SECONDS = 60
+
+TIMESTAMP_NOTE = """
+    The transcript carries [m:ss] timestamps. Start every bullet point with the timestamp where that point is made, like "- [12:05] ...".
+    """
+
+MAP_PROMPT = """
+    You are summarizing one part ({start} to {end}) of a YouTube video transcript for a student's notes.
+    List the key points of this part as bullet points, keeping the facts, definitions and examples needed to revise it.
+    """ + TIMESTAMP_NOTE + """
+    Transcript:
+    """
+
+REDUCE_PROMPT = """
+    Below are bullet point notes from consecutive parts of a YouTube video, in order.
+    Merge them into one set of bullet points: combine points that repeat, keep the earliest timestamp of each point and keep the order of the video.
+    Every bullet keeps its [m:ss] timestamp.
+    Notes:
+    """
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def transcript_text(segments):
+    """Plain transcript text, joined in one pass"""
+    return " ".join(segment["text"] for segment in segments)
+
+
+def split_transcript(segments, section_chars=SECTION_CHARS, marker_seconds=MARKER_SECONDS):
+    """Group caption segments into sections of about `section_chars`, cutting only between segments.
+
+    Each section is a {"start", "end", "text"} dict whose text has a [m:ss]
+    marker every `marker_seconds`, so the model can cite where a point is made.
+    """
+    sections = []
+    parts, size, start, next_marker = [], 0, None, 0.0
+    for segment in segments:
+        text = segment["text"].strip()
+        if not text:
+            continue
+        if parts and size + len(text) > section_chars:
+            sections.append({"start": start, "end": segment["start"], "text": " ".join(parts)})
+            parts, size, start = [], 0, None
+        if start is None:
+            start = segment["start"]
+            next_marker = segment["start"]
+        if segment["start"] >= next_marker:
+            text = f"[{format_timestamp(segment['start'])}] {text}"
+            next_marker = segment["start"] - segment["start"] % marker_seconds + marker_seconds
+        parts.append(text)
+        size += len(text) + 1
+    if parts:
+        last = segments[-1]
+        sections.append({"start": start, "end": last["start"] + last.get("duration", 0), "text": " ".join(parts)})
+    return sections
+
+
+def _map_section(section, generate):
+    prompt = MAP_PROMPT.format(start=format_timestamp(section["start"]), end=format_timestamp(section["end"]))
+    return generate(prompt + section["text"])
+
+
+def summarize_transcript(segments, prompt, generate, section_chars=SECTION_CHARS, max_parallel=MAX_PARALLEL_SECTIONS, fan_in=REDUCE_FAN_IN):
+    """Timestamped bullet notes for a transcript, written by `generate(prompt_text)`.
+
+    A transcript that fits in one section is summarized with `prompt` in a
+    single call. Longer ones are map-reduced: every section is summarized
+    concurrently, then the partial notes are merged `fan_in` at a time, level
+    by level, until one final call with `prompt` writes the notes.
+    """
+    sections = split_transcript(segments, section_chars)
+    if not sections:
+        return ""
+    if len(sections) == 1:
+        return generate(prompt + TIMESTAMP_NOTE + sections[0]["text"])
+
+    logging.info(f"Summarizing a transcript in {len(sections)} sections")
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        partials = list(executor.map(lambda section: _map_section(section, generate), sections))
+        while len(partials) > fan_in:
+            groups = [partials[start:start + fan_in] for start in range(0, len(partials), fan_in)]
+            partials = list(executor.map(lambda group: generate(REDUCE_PROMPT + "\n\n".join(group)), groups))
+    return generate(prompt + TIMESTAMP_NOTE + REDUCE_PROMPT + "\n\n".join(partials))
@@ -0,0 +1,35 @@
+import os
+import json
+
+from youtube_transcript_api import YouTubeTranscriptApi
+
+# Read transcripts from <dir>/<video_id>.json instead of YouTube when set
+TRANSCRIPT_DIR = os.getenv("SCHOLARAI_TRANSCRIPT_DIR")
+
+
+def youtube_transcript(video_id):
+    # Caption segments: [{"text", "start", "duration"}]
+    return YouTubeTranscriptApi.get_transcript(video_id)
+
+
+class LocalTranscriptSource:
+    """Transcripts stored as <directory>/<video_id>.json, a stand-in for YouTube in tests and offline runs"""
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    def _path(self, video_id):
+        return os.path.join(self.directory, f"{os.path.basename(video_id)}.json")
+
+    def __call__(self, video_id):
+        with open(self._path(video_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, video_id, segments):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(video_id), "w", encoding="utf-8") as f:
+            json.dump(segments, f)
+
+
+def get_transcript_source():
+    return LocalTranscriptSource(TRANSCRIPT_DIR) if TRANSCRIPT_DIR else youtube_transcript
@@ -0,0 +1,4 @@
+import os
+
+# The chains and models are built at import time, tests never call the API
+os.environ.setdefault("GOOGLE_API_KEY", "test")
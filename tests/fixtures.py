@@ -0,0 +1,75 @@
+"""Inputs shared by the tests, kept here so the suite does not depend on the benchmarks"""
+import io
+
+RESUME = (
+    "Backend engineer with six years of Python, Django and PostgreSQL experience. "
+    "Built REST APIs, data pipelines on Airflow and CI with GitHub Actions. "
+)
+JOB_DESCRIPTION = (
+    "About us: we are a fast growing fintech company serving small businesses across Europe. Our platform team owns "
+    "the payment, ledger and reporting services and works closely with product, data and security. "
+    "The role: as a Senior Backend Engineer you will design, build and operate the services behind our APIs, mentor "
+    "engineers, take part in the on-call rotation and help shape our technical roadmap. "
+    "Requirements: Python, PostgreSQL, Kubernetes, Terraform, GraphQL, AWS.\n"
+    "- 5+ years building production backend services\n"
+    "- Event driven architecture\n"
+    "- Distributed systems and observability\n"
+    "Nice to have: Kafka, Go, experience in regulated industries. "
+    "What we offer: competitive salary, stock options, a learning budget, flexible hours and remote work within Europe. "
+    "We value diversity and encourage applicants from all backgrounds to apply, even if they do not meet every requirement."
+)
+
+LOREM = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. "
+    "The light dependent reactions take place in the thylakoid membranes while the "
+    "Calvin cycle fixes carbon dioxide in the stroma of the chloroplast. "
+)
+
+
+def make_pdf(pages=50, lines_per_page=40, text=LOREM):
+    """Build a plain text PDF in memory so tests need no sample files"""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(None)
+    page_ids = []
+    for page_number in range(pages):
+        lines = [f"Page {page_number + 1} line {n}: {text[:90]}" for n in range(lines_per_page)]
+        content = "BT /F1 10 Tf 40 800 Td 12 TL " + " ".join(
+            "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") '"
+            for line in lines
+        ) + " ET"
+        data = content.encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font_id, content_id)
+        ))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref))
+    return out.getvalue()
+
+
+class UploadedFile(io.BytesIO):
+    """Minimal stand-in for Streamlit's UploadedFile"""
+
+    def __init__(self, data, name="sample.pdf"):
+        super().__init__(data)
+        self.name = name
@@ -0,0 +1,18 @@
+from src.askpdf.answer_cache import AnswerCache, question_signature
+
+
+def test_signature_normalizes_numbers_and_finds_entities():
+    assert question_signature("Summarize chapter three") == question_signature("summarize chapter 3.0")
+    assert question_signature("What is the capital of France?") == {"france"}
+    assert question_signature("explain photosynthesis") == frozenset()
+
+
+def test_similar_question_reuses_an_answer_only_with_the_same_numbers_and_names():
+    cache = AnswerCache()
+    vector = [1.0, 0.0, 0.0]
+    cache.put("default", 1, "Summarize chapter 3", "Chapter 3 covers cells.", vector)
+    cache.put("default", 1, "What is the capital of France?", "Paris.", [0.0, 1.0, 0.0])
+
+    assert cache.get("default", 1, "Give me a summary of chapter 3", vector) == "Chapter 3 covers cells."
+    assert cache.get("default", 1, "Summarize chapter 4", vector) is None
+    assert cache.get("default", 1, "What is the capital of Spain?", [0.0, 1.0, 0.0]) is None
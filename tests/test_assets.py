@@ -0,0 +1,27 @@
+import json
+
+from src.core import assets
+
+ANIMATION = {
+    "layers": [{
+        "ks": {"p": {"a": 1, "k": [{"s": [120.123456, 80.987654], "i": {"x": [0.667], "y": [1.0]}, "o": {"x": [0.3331], "y": [0.0]}}]}},
+        "shapes": [{"ty": "fl", "c": {"a": 0, "k": [0.956862745, 0.262745098, 0.211764706, 1]}}],
+    }],
+}
+
+
+def test_lottie_is_loaded_unchanged_by_default(tmp_path, monkeypatch):
+    path = tmp_path / "robot.json"
+    path.write_text(json.dumps(ANIMATION), encoding="utf-8")
+    monkeypatch.setattr(assets, "LOTTIE_PRECISION", None)
+    assets.clear_assets()
+    assert assets.load_lottie(str(path)) == ANIMATION
+
+
+def test_rounding_keeps_colors_and_easing_exact():
+    rounded = assets._round_floats(ANIMATION, 2)
+    keyframe = rounded["layers"][0]["ks"]["p"]["k"][0]
+    assert keyframe["s"] == [120.12, 80.99]
+    assert keyframe["i"] == {"x": [0.667], "y": [1.0]}
+    assert keyframe["o"] == {"x": [0.3331], "y": [0.0]}
+    assert rounded["layers"][0]["shapes"][0]["c"] == ANIMATION["layers"][0]["shapes"][0]["c"]
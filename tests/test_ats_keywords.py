@@ -0,0 +1,21 @@
+from tests.fixtures import JOB_DESCRIPTION, RESUME
+from src.ats.keywords import KeywordScorer, extract_keywords
+
+REQUIRED = {"python", "postgresql", "kubernetes", "terraform", "graphql", "aws"}
+
+
+def test_required_skills_rank_first():
+    keywords = [term for term, _ in extract_keywords(JOB_DESCRIPTION)]
+    assert set(keywords[:len(REQUIRED)]) == REQUIRED
+
+
+def test_boilerplate_is_not_a_keyword():
+    keywords = {term for term, _ in extract_keywords(JOB_DESCRIPTION)}
+    for boilerplate in ("competitive salary", "stock options", "europe", "fintech", "diversity"):
+        assert boilerplate not in keywords
+
+
+def test_exact_skills_resume_outscores_generic_resume():
+    exact, generic = KeywordScorer(JOB_DESCRIPTION).evaluate(["Python PostgreSQL Kubernetes Terraform GraphQL AWS", RESUME])
+    assert int(exact["PercentageMatch"].rstrip("%")) > int(generic["PercentageMatch"].rstrip("%"))
+    assert not REQUIRED & set(exact["MissingKeywordsintheResume"])
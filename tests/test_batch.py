@@ -0,0 +1,26 @@
+import os
+import json
+
+from tests.fixtures import make_pdf
+from src.mcqgenerator import batch
+
+
+def run(folder, output, number):
+    return batch.main([str(folder), "--output", str(output), "--subject", "Biology", "--number", str(number), "--stub"])
+
+
+def test_uppercase_extensions_and_changed_settings(tmp_path):
+    folder = tmp_path / "course"
+    folder.mkdir()
+    (folder / "B.PDF").write_bytes(make_pdf(pages=2))
+    (folder / "a.TXT").write_text("Cells divide by mitosis. Plants make sugar.", encoding="utf-8")
+    output = tmp_path / "quizzes.jsonl"
+
+    assert run(folder, output, 3) == 0
+    assert run(folder, output, 3) == 0
+    assert run(folder, output, 5) == 0
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted((os.path.basename(record["file"]), record["number"]) for record in records) == [
+        ("B.PDF", 3), ("B.PDF", 5), ("a.TXT", 3), ("a.TXT", 5),
+    ]
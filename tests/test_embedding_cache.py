@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.askpdf.embeddings import EmbeddingCache
+
+
+def test_vectors_survive_reload(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["k1", "k2"], [[1, 0, 0], [0, 1, 0]])
+    reloaded = EmbeddingCache(str(tmp_path))
+    assert np.array_equal(reloaded.get_many(["k2"])["k2"], [0, 1, 0])
+
+
+def test_vector_left_by_a_crash_is_not_given_to_the_next_key(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["k1", "k2"], [[1, 0, 0], [0, 0, 1]])
+    # A crash after the vector append but before its key line
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.array([[0, 1, 0]], dtype=np.float32).tobytes())
+
+    reloaded = EmbeddingCache(str(tmp_path))
+    reloaded.put_many(["k3"], [[0, 0, 1]])
+    assert np.array_equal(reloaded.get_many(["k3"])["k3"], [0, 0, 1])
+    assert np.array_equal(EmbeddingCache(str(tmp_path)).get_many(["k3"])["k3"], [0, 0, 1])
+
+
+def test_caches_sharing_a_directory_stay_aligned(tmp_path):
+    first, second = EmbeddingCache(str(tmp_path)), EmbeddingCache(str(tmp_path))
+    first.put_many(["a"], [[1, 0]])
+    second.put_many(["b"], [[0, 1]])
+    first.put_many(["c"], [[1, 1]])
+
+    reloaded = EmbeddingCache(str(tmp_path))
+    vectors = reloaded.get_many(["a", "b", "c"])
+    assert np.array_equal(vectors["a"], [1, 0])
+    assert np.array_equal(vectors["b"], [0, 1])
+    assert np.array_equal(vectors["c"], [1, 1])
+
+
+def test_key_files_without_rows_still_load(tmp_path):
+    with open(tmp_path / "dim", "w") as f:
+        f.write("2")
+    with open(tmp_path / "keys.txt", "w") as f:
+        f.write("old1\nold2\n")
+    np.array([[1, 0], [0, 1]], dtype=np.float32).tofile(tmp_path / "vectors.f32")
+
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["new"], [[1, 1]])
+    vectors = EmbeddingCache(str(tmp_path)).get_many(["old2", "new"])
+    assert np.array_equal(vectors["old2"], [0, 1])
+    assert np.array_equal(vectors["new"], [1, 1])
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+from tests.fixtures import make_pdf
+from src.core import extraction
+
+
+def test_parallel_extraction_matches_inline_and_removes_its_temp_file(tmp_path, monkeypatch):
+    data = make_pdf(pages=12)
+    inline = extraction.extract_pdf_bytes(data)
+
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(extraction, "PARALLEL_PAGE_THRESHOLD", 4)
+    monkeypatch.setattr(extraction, "MAX_WORKERS", 2)
+    extraction.shutdown_executor()
+    try:
+        parallel = extraction.extract_pdf_bytes(data)
+    finally:
+        extraction.shutdown_executor()
+
+    assert parallel.text == inline.text
+    assert parallel.page_offsets == inline.page_offsets
+    assert os.listdir(tmp_path) == []
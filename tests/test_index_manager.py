@@ -0,0 +1,45 @@
+import os
+import time
+import pickle
+
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.askpdf.index_manager import DEFAULT_NAMESPACE, IndexManager
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+
+
+def write_legacy_index(directory, texts):
+    # The faiss_index.bin and pickled faiss_store.pkl that earlier versions saved
+    store = FAISS.from_texts(texts, EMBEDDINGS)
+    faiss.write_index(store.index, os.path.join(directory, "faiss_index.bin"))
+    with open(os.path.join(directory, "faiss_store.pkl"), "wb") as f:
+        pickle.dump({"docstore": store.docstore, "index_to_docstore_id": store.index_to_docstore_id}, f)
+
+
+def test_legacy_index_is_imported_into_the_default_namespace(tmp_path):
+    write_legacy_index(str(tmp_path), ["photosynthesis makes sugar", "mitochondria make energy"])
+    manager = IndexManager(EMBEDDINGS, root=str(tmp_path / "indexes"))
+
+    assert manager.import_legacy(str(tmp_path))
+    assert not manager.import_legacy(str(tmp_path))
+    assert os.path.exists(tmp_path / "faiss_store.pkl.migrated")
+    assert list(manager.documents(DEFAULT_NAMESPACE)) == ["legacy"]
+    docs = manager.open(DEFAULT_NAMESPACE).similarity_search("mitochondria make energy", k=1)
+    assert docs[0].page_content == "mitochondria make energy"
+
+
+def test_idle_namespaces_are_dropped(tmp_path):
+    manager = IndexManager(EMBEDDINGS, root=str(tmp_path))
+    for namespace in (DEFAULT_NAMESPACE, "old", "recent"):
+        with manager.writing(namespace) as index:
+            index.add_document("doc", "doc.pdf", [f"notes of {namespace}"])
+    month_ago = time.time() - 31 * 86400
+    for namespace in (DEFAULT_NAMESPACE, "old"):
+        current = os.path.join(manager.namespace_dir(namespace), "CURRENT")
+        os.utime(current, (month_ago, month_ago))
+
+    assert manager.drop_idle(max_idle_days=30) == ["old"]
+    assert manager.namespaces() == [DEFAULT_NAMESPACE, "recent"]
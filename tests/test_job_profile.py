@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from src.ats import job_profile
+from src.core import llm_utils
+from src.core.text_cache import DiskCache
+
+DESC = "Requirements: Python, PostgreSQL, Kubernetes."
+REPLY = json.dumps({"RequiredSkills": ["Python", "PostgreSQL"], "Summary": "Backend engineer."})
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_profile, "_profile_cache", DiskCache(str(tmp_path / "job_profiles")))
+    monkeypatch.setattr(job_profile, "JOB_PROFILE_CACHE_ENABLED", True)
+    monkeypatch.setattr(job_profile, "_profiles", {})
+    monkeypatch.setattr(llm_utils, "retry_delay", lambda attempt, backoff=1.0: 0)
+
+
+def disk_entries():
+    return list(job_profile.get_profile_cache()._entries())
+
+
+def test_unparseable_reply_is_retried_and_a_fallback_is_not_stored(monkeypatch):
+    replies = []
+
+    def generate(prompt):
+        replies.append(prompt)
+        return "Sorry, I cannot do that."
+
+    profile = job_profile.get_job_profile(DESC, generate)
+    assert len(replies) == job_profile.RETRIES + 1
+    assert not profile.from_model and profile.skills
+    assert disk_entries() == []
+
+    # Past the fallback TTL the model is asked again, and a good reply is stored
+    monkeypatch.setattr(job_profile, "FALLBACK_TTL_SECONDS", -1)
+    profile = job_profile.get_job_profile(DESC, lambda prompt: REPLY)
+    assert profile.from_model and profile.skills == ["Python", "PostgreSQL"]
+    assert len(disk_entries()) == 1
+
+
+def test_build_lock_is_released_when_generate_raises():
+    def failing(prompt):
+        raise RuntimeError("quota exceeded")
+
+    with pytest.raises(RuntimeError):
+        job_profile.get_job_profile(DESC, failing)
+    assert job_profile._building == {}
+    assert job_profile.get_job_profile(DESC, lambda prompt: REPLY).from_model
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from src.core.llm_utils import acall_with_retry, call_with_retry, json_object_text, parse_json_object
+
+
+def test_json_object_is_cut_out_of_fenced_prose():
+    reply = 'Here you go:\n```json\n{"1": {"mcq": "Q?"}}\n```\nGood luck!'
+    assert json_object_text(reply) == '{"1": {"mcq": "Q?"}}'
+    assert json_object_text("no json here") == ""
+    assert parse_json_object(reply) == {"1": {"mcq": "Q?"}}
+    with pytest.raises(ValueError):
+        parse_json_object("Sorry, I cannot help with that.")
+
+
+def flaky(failures, result):
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise RuntimeError("quota exceeded")
+        return result
+    return call, calls
+
+
+def test_retries_until_success_and_gives_up_after_the_last_attempt():
+    call, calls = flaky(2, "ok")
+    assert call_with_retry(call, retries=2, backoff=0) == "ok"
+    assert len(calls) == 3
+
+    call, calls = flaky(3, "ok")
+    with pytest.raises(RuntimeError):
+        call_with_retry(call, retries=2, backoff=0)
+    assert len(calls) == 3
+
+
+def test_async_retry():
+    call, calls = flaky(1, "ok")
+
+    async def acall():
+        return call()
+
+    assert asyncio.run(acall_with_retry(acall, retries=1, backoff=0)) == "ok"
+    assert len(calls) == 2
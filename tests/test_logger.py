@@ -0,0 +1,23 @@
+import logging
+
+from src.core import extraction
+from src.mcqgenerator import logger
+
+
+def log_from_worker(message):
+    logging.getLogger("scholarai.test").warning(message)
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+
+def test_records_logged_in_an_extraction_worker_reach_the_log_file(tmp_path, monkeypatch):
+    log_file = tmp_path / "scholarai.log"
+    monkeypatch.setattr(logger, "LOG_FILE_PATH", str(log_file))
+    monkeypatch.setattr(extraction, "MAX_WORKERS", 2)
+    extraction.shutdown_executor()
+    try:
+        extraction._get_executor().submit(log_from_worker, "logged from a pool worker").result()
+    finally:
+        extraction.shutdown_executor()
+
+    assert "logged from a pool worker" in log_file.read_text(encoding="utf-8")
@@ -0,0 +1,23 @@
+from src.mcqgenerator.map_reduce import allocate_questions
+
+
+def test_fewer_questions_than_sections_are_spread_over_the_document():
+    sections = ["x" * 1000] * 56
+    counts = allocate_questions(10, sections)
+    chosen = [position for position, count in enumerate(counts) if count]
+    assert sum(counts) == 10
+    assert max(counts) == 1
+    # One question in every tenth of the book, the last ones near the end
+    assert chosen[0] < 56 // 10
+    assert chosen[-1] >= 56 - 56 // 10
+    assert all(later - earlier >= 4 for earlier, later in zip(chosen, chosen[1:]))
+
+
+def test_allocation_follows_section_length():
+    counts = allocate_questions(12, ["x" * 3000, "x" * 1000, "x" * 2000])
+    assert counts == [6, 2, 4]
+
+
+def test_every_question_is_allocated():
+    for number in (1, 5, 17, 40):
+        assert sum(allocate_questions(number, ["x" * 700, "x" * 1300, "x" * 50, "x" * 900])) == number
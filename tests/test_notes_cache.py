@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from src.core.text_cache import DiskCache
+from src.notes import notes_cache
+
+SEGMENTS = [{"start": 0.0, "duration": 4.0, "text": "Welcome to the lecture."}, {"start": 4.0, "duration": 5.0, "text": "Today: entropy."}]
+PROMPT = "Write notes for this video."
+
+
+@pytest.fixture
+def caches(tmp_path, monkeypatch):
+    transcripts = DiskCache(str(tmp_path / "transcripts"), ttl=60)
+    notes = DiskCache(str(tmp_path / "notes"), ttl=60)
+    monkeypatch.setattr(notes_cache, "_transcript_cache", transcripts)
+    monkeypatch.setattr(notes_cache, "_notes_cache", notes)
+    monkeypatch.setattr(notes_cache, "NOTES_CACHE_ENABLED", True)
+    return transcripts, notes
+
+
+def expire_all(cache):
+    for name in os.listdir(cache.directory):
+        path = os.path.join(cache.directory, name)
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        stored["written_at"] -= 3600
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+
+
+def test_transcript_is_fetched_once_until_it_expires(caches):
+    fetched = []
+
+    def source(video_id):
+        fetched.append(video_id)
+        return SEGMENTS
+
+    assert notes_cache.cached_transcript("abc123", source) == SEGMENTS
+    assert notes_cache.cached_transcript(" abc123 ", source) == SEGMENTS
+    assert fetched == ["abc123"]
+
+    notes_cache.cached_transcript("xyz789", source)
+    assert fetched == ["abc123", "xyz789"]
+
+    expire_all(caches[0])
+    notes_cache.cached_transcript("abc123", source)
+    assert fetched == ["abc123", "xyz789", "abc123"]
+
+
+def test_notes_are_summarized_once_per_transcript_and_prompt(caches):
+    calls = []
+
+    def summarize(segments):
+        calls.append(segments)
+        return f"- [0:00] notes {len(calls)}"
+
+    first = notes_cache.cached_notes("abc123", SEGMENTS, PROMPT, summarize)
+    assert notes_cache.cached_notes("abc123", SEGMENTS, PROMPT, summarize) == first
+    assert len(calls) == 1
+
+    # A new prompt version or re-published captions are a miss
+    notes_cache.cached_notes("abc123", SEGMENTS, PROMPT + " Be brief.", summarize)
+    notes_cache.cached_notes("abc123", SEGMENTS[:1], PROMPT, summarize)
+    assert len(calls) == 3
+
+    # Regenerating refreshes the stored notes
+    refreshed = notes_cache.cached_notes("abc123", SEGMENTS, PROMPT, summarize, use_cache=False)
+    assert refreshed != first
+    assert notes_cache.cached_notes("abc123", SEGMENTS, PROMPT, summarize) == refreshed
+    assert len(calls) == 4
+
+    expire_all(caches[1])
+    notes_cache.cached_notes("abc123", SEGMENTS, PROMPT, summarize)
+    assert len(calls) == 5
+
+
+def test_prompt_version_follows_the_map_reduce_settings(monkeypatch):
+    version = notes_cache.prompt_version(PROMPT)
+    assert version == notes_cache.prompt_version(PROMPT)
+    monkeypatch.setattr(notes_cache, "REDUCE_FAN_IN", notes_cache.REDUCE_FAN_IN + 1)
+    assert notes_cache.prompt_version(PROMPT) != version
+
+
+def test_empty_results_are_not_cached(caches):
+    calls = []
+
+    def summarize(segments):
+        calls.append(segments)
+        return ""
+
+    notes_cache.cached_notes("abc123", SEGMENTS, PROMPT, summarize)
+    notes_cache.cached_notes("abc123", SEGMENTS, PROMPT, summarize)
+    assert len(calls) == 2
+    assert notes_cache.cached_transcript("abc123", lambda video_id: []) == []
+    assert caches[0].size() == 0
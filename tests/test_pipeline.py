@@ -0,0 +1,79 @@
+import pytest
+from PyPDF2.errors import PdfReadError
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from tests.fixtures import LOREM, UploadedFile, make_pdf
+from src.core import text_cache
+from src.askpdf.pipeline import ingest_stream, stream_chunks
+from src.askpdf.vector_store import IncrementalIndex, index_paths
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+
+
+def make_splitter():
+    return RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=60, add_start_index=True)
+
+
+def make_pages(count):
+    return [f"Page {n}. " + LOREM * (1 + n % 3) + "\n" for n in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def text_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_cache, "_default_cache", text_cache.DiskCache(str(tmp_path / "text")))
+
+
+@pytest.mark.parametrize("flush_chars", [1, 500, 2000, 10 ** 9])
+def test_stream_chunks_matches_splitting_the_whole_text(flush_chars):
+    pages = make_pages(12)
+    splitter = make_splitter()
+    text = "".join(pages)
+    starts = [sum(len(page) for page in pages[:n]) for n in range(len(pages))]
+    expected = [
+        (document.page_content, max(n for n, start in enumerate(starts) if start <= document.metadata["start_index"]))
+        for document in splitter.create_documents([text])
+    ]
+
+    assert list(stream_chunks(iter(pages), splitter, flush_chars=flush_chars)) == expected
+
+
+def make_files(*texts):
+    return [UploadedFile(make_pdf(pages=3, lines_per_page=20, text=text), name=f"doc{n}.pdf") for n, text in enumerate(texts)]
+
+
+def test_ingest_stream_indexes_new_documents_and_skips_known_ones(tmp_path):
+    index = IncrementalIndex(EMBEDDINGS, **index_paths(str(tmp_path / "index")))
+    files = make_files("first lecture on cells", "second lecture on enzymes")
+    updates = []
+
+    stats = ingest_stream(index, files, make_splitter(), progress=updates.append, batch_size=4)
+
+    assert stats["processed"] == 2 and stats["skipped"] == 0
+    assert stats["pages"] == 6
+    assert stats["embedded"] == stats["chunks"] > 0
+    assert updates[-1] == stats
+    assert sorted(index.documents().values()) == ["doc0.pdf", "doc1.pdf"]
+    generation = index.generation
+
+    again = ingest_stream(index, files, make_splitter())
+    assert again["processed"] == 0 and again["skipped"] == 2
+    assert again["embedded"] == again["chunks"] == 0
+    assert index.generation == generation
+
+
+class FailingEmbeddings(DeterministicFakeEmbedding):
+    def embed_documents(self, texts):
+        raise RuntimeError("embedding service unavailable")
+
+
+def test_ingest_stream_raises_a_stage_exception_on_the_calling_thread(tmp_path):
+    index = IncrementalIndex(FailingEmbeddings(size=8), **index_paths(str(tmp_path / "index")))
+
+    with pytest.raises(RuntimeError, match="embedding service unavailable"):
+        ingest_stream(index, make_files("cells"), make_splitter())
+    assert index.documents() == {}
+
+    index = IncrementalIndex(EMBEDDINGS, **index_paths(str(tmp_path / "other")))
+    with pytest.raises(PdfReadError):
+        ingest_stream(index, [UploadedFile(b"not a pdf", name="broken.pdf")], make_splitter())
@@ -0,0 +1,14 @@
+from langchain_core.documents import Document
+
+from src.askpdf.qa_chain import FakeStreamingModel, stream_answer
+
+
+def test_answer_streams_in_order_with_the_chunks_in_the_prompt():
+    model = FakeStreamingModel(responses=("Mitochondria make ATP.",))
+    docs = [Document(page_content="Mitochondria are organelles."), Document(page_content="They make ATP.")]
+
+    tokens = list(stream_answer(docs, "What do mitochondria make?", model=model))
+
+    assert tokens == ["Mitochondria ", "make ", "ATP."]
+    assert "Mitochondria are organelles.\n\nThey make ATP." in model.prompts[0]
+    assert "What do mitochondria make?" in model.prompts[0]
@@ -0,0 +1,37 @@
+import json
+
+from src.mcqgenerator.question_bank import QuestionBank, fill_quiz
+
+TEXT = "Mitochondria release energy from glucose."
+
+
+def make_generate(reviews):
+    calls = []
+
+    def generate(count):
+        calls.append(count)
+        quiz = {
+            str(n): {"mcq": f"Question {len(calls)}.{n}?", "options": {"a": "Yes", "b": "No"}, "correct": "a"}
+            for n in range(1, count + 1)
+        }
+        return {"quiz": json.dumps(quiz), "review": reviews}
+    return generate, calls
+
+
+def test_review_is_left_for_the_whole_quiz_when_questions_come_from_the_bank(tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    generate, calls = make_generate("Covers the new questions.")
+
+    first = fill_quiz(bank, TEXT, 4, "Biology", "Simple", generate, user_id="alice")
+    assert first["review"] == "Covers the new questions." and first["from_bank"] == 0
+
+    # Bob gets the four banked questions and nothing is generated
+    banked = fill_quiz(bank, TEXT, 4, "Biology", "Simple", generate, user_id="bob")
+    assert calls == [4]
+    assert banked["from_bank"] == 4 and banked["review"] is None
+
+    # Bob has seen them all, two more are banked by Carol and the rest is generated
+    fill_quiz(bank, TEXT, 2, "Biology", "Simple", generate, user_id="carol", reuse=False)
+    mixed = fill_quiz(bank, TEXT, 4, "Biology", "Simple", generate, user_id="bob")
+    assert mixed["from_bank"] == 2 and mixed["review"] is None
+    assert len(json.loads(mixed["quiz"])) == 4
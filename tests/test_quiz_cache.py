@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from src.core.text_cache import DiskCache
+from src.mcqgenerator import quiz_cache
+from src.mcqgenerator.question_bank import QuestionBank, fill_quiz
+
+TEXT = "Photosynthesis turns light into chemical energy in the chloroplast."
+
+
+def make_quiz(count, offset=0):
+    return {
+        str(n): {"mcq": f"Question {n + offset} about chloroplasts?", "options": {"a": "Yes", "b": "No"}, "correct": "a"}
+        for n in range(1, count + 1)
+    }
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(quiz_cache, "_quiz_cache", DiskCache(str(tmp_path / "mcq")))
+    monkeypatch.setattr(quiz_cache, "MCQ_CACHE_ENABLED", True)
+
+
+def test_exact_repeat_in_one_session_makes_no_llm_call(tmp_path, cache):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    calls = []
+
+    def generate(count):
+        calls.append(count)
+        return {"quiz": json.dumps(make_quiz(count, offset=10 * len(calls))), "review": "Fits the level."}
+
+    key = quiz_cache.quiz_cache_key(TEXT, 3, "Biology", "Simple", "auto")
+    responses = [
+        quiz_cache.cached_fill_quiz(key, lambda: fill_quiz(bank, TEXT, 3, "Biology", "Simple", generate, user_id="session"))
+        for _ in range(2)
+    ]
+
+    assert calls == [3]
+    assert json.loads(responses[1]["quiz"]) == json.loads(responses[0]["quiz"])
+    assert responses[1]["review"] == "Fits the level."
+
+
+def test_key_covers_the_settings_and_unreviewed_quizzes_wait(cache):
+    key = quiz_cache.quiz_cache_key(TEXT, 3, "Biology", "Simple", "auto")
+    assert key == quiz_cache.quiz_cache_key(TEXT, 3, " biology ", "SIMPLE", "auto")
+    assert key != quiz_cache.quiz_cache_key(TEXT, 4, "Biology", "Simple", "auto")
+    assert key != quiz_cache.quiz_cache_key(TEXT, 3, "Biology", "Simple", "auto", review_mode="fused")
+
+    quiz_cache.store_quiz(key, {"quiz": json.dumps(make_quiz(3)), "review": None})
+    assert quiz_cache.lookup_quiz(key) is None
+    quiz_cache.store_quiz(key, {"quiz": json.dumps(make_quiz(3)), "review": "Written later."})
+    assert quiz_cache.lookup_quiz(key)["review"] == "Written later."
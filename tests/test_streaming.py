@@ -0,0 +1,34 @@
+import json
+
+from src.mcqgenerator.streaming import iter_quiz_questions
+
+QUIZ = {
+    "1": {"mcq": "Which brace opens an object: { or }?", "options": {"a": "{", "b": "}"}, "correct": "a"},
+    "2": {"mcq": 'What does the \\"stroma\\" hold?', "options": {"a": "Enzymes \"of\" the Calvin cycle", "b": "DNA"}, "correct": "a"},
+    "3": {"mcq": "Where is ATP made?", "options": {"a": "Mitochondria", "b": "Ribosome"}, "correct": "a"},
+}
+OUTPUT = "```json\n" + json.dumps(QUIZ, indent=2) + "\n```\nLet me know if you need more."
+
+
+def parse(pieces):
+    return dict(iter_quiz_questions(pieces))
+
+
+def test_code_fenced_quiz_with_braces_and_escaped_quotes_in_strings():
+    assert parse([OUTPUT]) == QUIZ
+
+
+def test_stream_split_at_every_position():
+    for position in range(len(OUTPUT) + 1):
+        assert parse([OUTPUT[:position], OUTPUT[position:]]) == QUIZ, position
+    assert parse(list(OUTPUT)) == QUIZ
+
+
+def test_prose_before_the_quiz_is_skipped():
+    assert parse(["Sure! Here is your quiz:\n\n" + OUTPUT]) == QUIZ
+    assert parse(["Here is a quiz on {photosynthesis} with {3} questions:\n" + OUTPUT]) == QUIZ
+
+
+def test_questions_are_yielded_before_the_quiz_ends():
+    questions = iter_quiz_questions(iter([OUTPUT[:OUTPUT.index('"2"')], "never read"]))
+    assert next(questions) == ("1", QUIZ["1"])
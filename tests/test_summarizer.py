@@ -0,0 +1,69 @@
+import threading
+
+from src.notes.summarizer import REDUCE_PROMPT, format_timestamp, split_transcript, summarize_transcript
+
+PROMPT = "Write notes for this video."
+
+
+def make_segments(count, words=20):
+    return [{"start": 15.0 * n, "duration": 15.0, "text": f"segment {n} " + "word " * words} for n in range(count)]
+
+
+def test_format_timestamp():
+    assert format_timestamp(5) == "0:05"
+    assert format_timestamp(725.9) == "12:05"
+    assert format_timestamp(3725) == "1:02:05"
+
+
+def test_split_cuts_between_segments_and_marks_every_minute():
+    segments = make_segments(40)
+    sections = split_transcript(segments, section_chars=1000)
+
+    assert len(sections) > 1
+    assert sections[0]["start"] == 0.0
+    assert sections[-1]["end"] == segments[-1]["start"] + segments[-1]["duration"]
+    for section, following in zip(sections, sections[1:]):
+        assert section["end"] == following["start"]
+    text = " ".join(section["text"] for section in sections)
+    for n in range(40):
+        assert f"segment {n} " in text
+    assert "[0:00] segment 0" in text
+    assert "[1:00] segment 4" in text
+    assert "[0:15]" not in text
+
+
+def test_short_transcript_is_summarized_in_one_call():
+    calls = []
+
+    def generate(prompt):
+        calls.append(prompt)
+        return "- [0:00] notes"
+
+    assert summarize_transcript(make_segments(3), PROMPT, generate) == "- [0:00] notes"
+    assert len(calls) == 1
+    assert calls[0].startswith(PROMPT)
+
+
+def test_long_transcript_is_map_reduced_with_the_fan_in():
+    lock = threading.Lock()
+    calls = []
+
+    def generate(prompt):
+        with lock:
+            calls.append(prompt)
+        return "- [0:00] partial"
+
+    sections = split_transcript(make_segments(60), section_chars=200)
+    assert len(sections) > 9
+    notes = summarize_transcript(make_segments(60), PROMPT, generate, section_chars=200, fan_in=3)
+
+    assert notes == "- [0:00] partial"
+    reduces = [call for call in calls if call.startswith(REDUCE_PROMPT)]
+    # Every section is mapped, merged three at a time until one final call is left
+    levels, partials = 0, len(sections)
+    while partials > 3:
+        partials = -(-partials // 3)
+        levels += partials
+    assert len(calls) == len(sections) + levels + 1
+    assert len(reduces) == levels
+    assert calls[-1].startswith(PROMPT)
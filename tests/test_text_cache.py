@@ -0,0 +1,58 @@
+import json
+import os
+
+from src.core.text_cache import DiskCache, content_hash
+
+ENTRY = {"text": "x" * 200}
+
+
+def age(cache, key, seconds_ago):
+    path = os.path.join(cache.directory, f"{key}.json")
+    when = os.stat(path).st_mtime - seconds_ago
+    os.utime(path, (when, when))
+
+
+def test_hit_returns_the_stored_entry_and_miss_returns_none(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = content_hash(b"document bytes")
+    assert cache.get(key) is None
+
+    cache.put(key, ENTRY)
+    assert cache.get(key) == ENTRY
+    assert cache.get(content_hash(b"other bytes")) is None
+
+
+def test_entries_older_than_the_ttl_are_dropped(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=60)
+    cache.put("fresh", ENTRY)
+    cache.put("stale", ENTRY)
+    path = os.path.join(cache.directory, "stale.json")
+    with open(path, "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    stored["written_at"] -= 3600
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stored, f)
+
+    assert cache.get("fresh") == ENTRY
+    assert cache.get("stale") is None
+    assert not os.path.exists(path)
+
+
+def test_size_cap_evicts_the_least_recently_used_entries(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    for key in ("a", "b", "c"):
+        cache.put(key, ENTRY)
+    entry_size = cache.size() // 3
+    age(cache, "a", 300)
+    age(cache, "b", 200)
+    age(cache, "c", 100)
+    # A hit makes "a" the most recently used entry
+    assert cache.get("a") == ENTRY
+
+    cache.max_bytes = entry_size * 3
+    cache.put("d", ENTRY)
+
+    assert cache.get("b") is None
+    assert cache.size() <= cache.max_bytes
+    for key in ("a", "c", "d"):
+        assert cache.get(key) == ENTRY